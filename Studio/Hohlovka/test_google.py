@@ -1,10 +1,16 @@
+import os
+import sys
+
 import gspread
 from oauth2client.service_account import ServiceAccountCredentials
 from datetime import datetime
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.sheets_quota import quota_client
+
 scope = ['https://spreadsheets.google.com/feeds', 'https://www.googleapis.com/auth/drive']
 creds = ServiceAccountCredentials.from_json_keyfile_name('google_key.json', scope)
-client = gspread.authorize(creds)
+client = quota_client(gspread.authorize(creds))
 
 # Словарь для русских имен месяцев
 months_ru = {
@@ -32,4 +38,5 @@ sheet_itogi = client.open_by_key('1lgn068NObnej5A0J0Ya4Kxz5JY6tptxKf9dZTf2VXrI')
 sheet_kassa = client.open_by_key('1biAzb8vVeaTsClkozuViWdxqQ10Bo5NI93SLtvZy1bk').sheet1
 
 print(f"Доступ ок! Лист: {sheet_name}, первая строка:", sheet_itogi.row_values(1))
-print("Первая строка Кассы:", sheet_kassa.row_values(1))
\ No newline at end of file
+print("Первая строка Кассы:", sheet_kassa.row_values(1))
+client.quota.report()
\ No newline at end of file
@@ -5,8 +5,14 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from webdriver_manager.chrome import ChromeDriverManager
 import time
+import os
+import sys
 from datetime import datetime
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.waits import Waiter
+from core.session import ensure_logged_in
+
 # Настройки Chrome
 chrome_options = webdriver.ChromeOptions()
 chrome_options.binary_location = r"C:\Program Files\Google\Chrome\Application\chrome.exe"
@@ -16,14 +22,8 @@ service = Service(ChromeDriverManager().install())
 driver = webdriver.Chrome(service=service, options=chrome_options)
 
 try:
-    # Вход в резерватор
-    driver.get("https://whitestudios.ru/reservator/login/")
-    login_field = WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.NAME, "login")))
-    password_field = WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.NAME, "pass")))
-    login_field.send_keys("Kapr")  # Твой логин
-    password_field.send_keys("vut79k")  # Твой пароль
-    driver.find_element(By.CSS_SELECTOR, 'input[type="submit"]').click()
-    time.sleep(5)
+    # Вход в резерватор (сохранённая сессия переиспользуется, см. core/session.py)
+    ensure_logged_in(driver, Waiter(driver), "Kapr", "vut79k")  # Твой логин и пароль
 
     # Получаем текущую дату
     current_date = datetime.now().strftime('%d.%m.%Y')  # Сегодня: '22.09.2025'
@@ -5,7 +5,12 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from webdriver_manager.chrome import ChromeDriverManager
 from config import RESERVATOR_URL, USERNAME, PASSWORD
-import time
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.waits import Waiter, url_changed
+from core.session import save_session
 
 # Указываем путь к Chrome
 chrome_options = webdriver.ChromeOptions()
@@ -30,11 +35,13 @@ try:
     # Нажимаем кнопку
     submit_button = driver.find_element(By.CSS_SELECTOR, 'input[type="submit"]')
     submit_button.click()
-    time.sleep(5)  # Ждём после логина
+    Waiter(driver).until('login', url_changed(RESERVATOR_URL), required=False)  # Ждём после логина
 
     # Проверяем, зашли ли
     if 'dashboard' in driver.current_url or 'reservations' in driver.current_url or '/login' not in driver.current_url:
         print("Логин успешно выполнен! Текст на странице:", driver.page_source[:200])
+        # Сохраняем сессию: main.py и test_grok.py подхватят её без повторного входа
+        save_session(driver, driver.current_url)
     else:
         print("Ошибка логина. Проверь логин/пароль. Текущий URL:", driver.current_url)
 
@@ -0,0 +1,9 @@
+# Все студии за один запуск: один Chrome, один вход, один клиент Google Sheets (см. core/engine.py)
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from core.engine import main
+
+if __name__ == "__main__":
+    main(['Hohlovka', 'Yauza'])
@@ -0,0 +1 @@
+"""Общий код для скриптов студий (Hohlovka/main.py, Yauza/yauza_main.py)."""
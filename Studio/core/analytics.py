@@ -0,0 +1,171 @@
+"""
+Локальная аналитическая база (SQLite): разобранные брони и строки кассы.
+
+- bookings: бронь студии (href, категория, дата, время, предоплата, длительность);
+- booking_days: учтённые часы брони в каждом дне (ночная бронь — две строки),
+  предоплата — только в первый день брони;
+- kassa_rows: строка листа кассы для каждой студии из описания, с категорией.
+  Итоги студии берутся только из её таблицы кассы (kassa_id) и листа месяца дня,
+  как у KassaLedger; дата строки должна быть записана ровно как 'dd.mm.yyyy'.
+
+Итоги дня для финансовой таблицы и таблица в GUI считаются SQL-запросами по этой
+базе; вопросы по прошлым годам и категориям — тоже, без резерватора и Google Sheets.
+День при повторном сборе перезаписывается целиком, лист кассы — при каждой загрузке.
+"""
+import sqlite3
+import threading
+from collections import defaultdict
+from datetime import datetime
+
+from core.kassa import kassa_entries, kassa_sheet_name
+from core.studios import STUDIOS, data_file
+
+ANALYTICS_FILE = data_file('studio_analytics.sqlite3')
+
+# Строки кассы помечены названием студии, брони и итоги — ключом STUDIOS
+FOLDER_BY_TAG = {profile['name'].lower(): key for key, profile in STUDIOS.items()}
+
+
+def iso_day(day_dt):
+    return day_dt.strftime('%Y-%m-%d')
+
+
+class AnalyticsStore:
+    def __init__(self, path=ANALYTICS_FILE):
+        # Пишут фоновая загрузка кассы и поток итогов конвейера, поэтому соединение общее под замком
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.days_recorded = 0
+        self.kassa_rows = 0
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS bookings (
+                href TEXT NOT NULL,
+                studio TEXT NOT NULL,
+                class TEXT NOT NULL,
+                booking_date TEXT,
+                start_time TEXT,
+                end_time TEXT,
+                prepayment INTEGER NOT NULL,
+                full_hours REAL NOT NULL,
+                PRIMARY KEY (href, studio)
+            );
+            CREATE TABLE IF NOT EXISTS booking_days (
+                href TEXT NOT NULL,
+                studio TEXT NOT NULL,
+                day TEXT NOT NULL,
+                class TEXT NOT NULL,
+                hours REAL NOT NULL,
+                prepayment INTEGER NOT NULL,
+                PRIMARY KEY (studio, day, href)
+            );
+            CREATE INDEX IF NOT EXISTS booking_days_class ON booking_days(class, day);
+            CREATE TABLE IF NOT EXISTS kassa_rows (
+                spreadsheet_id TEXT NOT NULL,
+                sheet_name TEXT NOT NULL,
+                row_num INTEGER NOT NULL,
+                studio TEXT NOT NULL,
+                day TEXT NOT NULL,
+                category TEXT,
+                amount INTEGER NOT NULL,
+                description TEXT NOT NULL,
+                PRIMARY KEY (spreadsheet_id, sheet_name, row_num, studio)
+            );
+            CREATE INDEX IF NOT EXISTS kassa_rows_sheet_day ON kassa_rows(spreadsheet_id, sheet_name, studio, day);
+        """)
+        self.conn.commit()
+
+    def record_day(self, studio, day_dt, bookings):
+        """
+        Учтённые брони студии за день: [(href, record, часы в этот день, полная длительность,
+        первый ли это день брони)]. Прежние строки дня удаляются (бронь могли отменить).
+        """
+        day = iso_day(day_dt)
+        booking_rows = []
+        day_rows = []
+        for href, record, hours_in_day, full_hours, first_day in bookings:
+            prepayment = record['prepayment'] or 0
+            booking_date = record.get('booking_date')
+            if booking_date:
+                booking_date = iso_day(datetime.strptime(booking_date, '%d.%m.%Y'))
+            booking_rows.append((href, studio, record['class'], booking_date, record['start'],
+                                 record['end'], prepayment, full_hours))
+            day_rows.append((href, studio, day, record['class'], hours_in_day,
+                             prepayment if first_day else 0))
+        with self.lock:
+            self.conn.execute("DELETE FROM booking_days WHERE studio = ? AND day = ?", (studio, day))
+            self.conn.executemany("INSERT OR REPLACE INTO bookings VALUES (?, ?, ?, ?, ?, ?, ?, ?)", booking_rows)
+            self.conn.executemany("INSERT INTO booking_days VALUES (?, ?, ?, ?, ?, ?)", day_rows)
+            self.conn.commit()
+        self.days_recorded += 1
+
+    def record_kassa(self, spreadsheet_id, sheet_name, rows):
+        """Строки листа кассы (как в таблице, с заголовком) заменяют прежние строки листа."""
+        values = []
+        for row_num, entry in kassa_entries(rows):
+            try:
+                day_dt = datetime.strptime(entry['date'], '%d.%m.%Y')
+            except ValueError:
+                continue  # строка без даты ни в один день не попадёт
+            # KassaLedger сравнивает дату строкой: '1.10.2025' ни в один день не попадает
+            if day_dt.strftime('%d.%m.%Y') != entry['date']:
+                continue
+            day = iso_day(day_dt)
+            for tag in entry['studios']:
+                values.append((spreadsheet_id, sheet_name, row_num, FOLDER_BY_TAG[tag], day,
+                               entry['category'], entry['amount'], entry['description']))
+        with self.lock:
+            self.conn.execute("DELETE FROM kassa_rows WHERE spreadsheet_id = ? AND sheet_name = ?",
+                              (spreadsheet_id, sheet_name))
+            self.conn.executemany("INSERT INTO kassa_rows VALUES (?, ?, ?, ?, ?, ?, ?, ?)", values)
+            self.conn.commit()
+        self.kassa_rows += len(values)
+
+    def day_totals(self, studio, day_dt):
+        """
+        Итоги дня студии из базы — те же поля, что у данных дня в core/engine.py.
+        Касса — только из таблицы кассы студии и листа месяца этого дня.
+        """
+        day = iso_day(day_dt)
+        kassa_id = STUDIOS[studio]['kassa_id']
+        totals = {'daily_hours_totals': defaultdict(float), 'daily_counts': defaultdict(int),
+                  'prep_photo': 0, 'prep_video': 0, 'fakt_photo': 0, 'fakt_video': 0, 'dop': 0,
+                  'parking_amount': 0, 'parking_count': 0}
+        with self.lock:
+            booking_rows = self.conn.execute(
+                "SELECT class, SUM(hours), COUNT(*), SUM(prepayment) FROM booking_days "
+                "WHERE studio = ? AND day = ? GROUP BY class", (studio, day)).fetchall()
+            kassa_rows = self.conn.execute(
+                "SELECT category, SUM(amount), COUNT(*) FROM kassa_rows "
+                "WHERE spreadsheet_id = ? AND sheet_name = ? AND studio = ? AND day = ? AND category IS NOT NULL "
+                "GROUP BY category", (kassa_id, kassa_sheet_name(day_dt), studio, day)).fetchall()
+        for cls, hours, count, prepayment in booking_rows:
+            totals['daily_hours_totals'][cls] = hours
+            totals['daily_counts'][cls] = count
+            if cls == 'photo':
+                totals['prep_photo'] = prepayment
+            elif cls == 'video_master':
+                totals['prep_video'] = prepayment
+        for category, amount, count in kassa_rows:
+            if category in ('dop', 'parking'):
+                totals['dop'] += amount
+                if category == 'parking':
+                    totals['parking_amount'] = amount
+                    totals['parking_count'] = count
+            else:
+                totals[category] = amount
+        return totals
+
+    def period_hours(self, studio, days):
+        """{категория: часы} студии за дни days (datetime)."""
+        placeholders = ','.join('?' * len(days))
+        with self.lock:
+            rows = self.conn.execute(
+                f"SELECT class, SUM(hours) FROM booking_days WHERE studio = ? AND day IN ({placeholders}) "
+                "GROUP BY class", [studio] + [iso_day(day) for day in days]).fetchall()
+        return dict(rows)
+
+    def report(self):
+        print(f"Аналитическая база: дней записано {self.days_recorded}, строк кассы {self.kassa_rows}")
+
+    def close(self):
+        self.conn.close()
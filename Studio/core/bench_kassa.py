@@ -0,0 +1,60 @@
+"""
+Сравнение построчного (KassaLedger) и столбцового (KassaColumns) подсчёта кассы
+на синтетическом листе: итоги должны совпадать, печатается время обоих вариантов.
+
+Запуск: python core/bench_kassa.py [число строк, по умолчанию 50000]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.kassa import KassaLedger, KassaColumns, STUDIO_TAGS, np
+
+DESC_WORDS = ['Выручка', 'Хохловка', 'Яуза', 'парковка', 'фон', 'аренда циклорамы', 'стойка',
+              'оплата', 'наличные', 'перевод', 'возврат', 'раннее начало', 'клиент']
+ANALYTICS = ['фото', 'видео', 'мастер-класс', 'прочее', '']
+AMOUNTS = ['р.1 000', 'р. 2 500', 'р.350', '-р.500', '', 'итого', 'р.']
+
+
+def synthetic_rows(count, seed=42):
+    rnd = random.Random(seed)
+    rows = [['Дата', 'Приход', '', 'Расход', 'Описание', 'Комментарий', 'Аналитика']]
+    for _ in range(count):
+        date = f"{rnd.randint(1, 31):02d}.10.2025" + rnd.choice(['', '', ' '])
+        desc = ' '.join(rnd.sample(DESC_WORDS, rnd.randint(1, 4)))
+        amount_b, amount_d = rnd.choice(AMOUNTS), rnd.choice(AMOUNTS)
+        row = [date, amount_b, '', amount_d, desc, rnd.choice(['', 'комментарий']), rnd.choice(ANALYTICS)]
+        rows.append(row[:rnd.choice([3, 5, 6, 7, 7, 7])])
+    return rows
+
+
+def all_totals(ledger, dates):
+    return {(d, tag): ledger.day_totals(d, tag) for d in dates for tag in STUDIO_TAGS}
+
+
+def main(count):
+    rows = synthetic_rows(count)
+    dates = [f"{day:02d}.10.2025" for day in range(1, 32)]
+
+    start = time.perf_counter()
+    by_rows = all_totals(KassaLedger(rows), dates)
+    rows_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    by_columns = all_totals(KassaColumns(rows), dates)
+    columns_time = time.perf_counter() - start
+
+    assert by_rows == by_columns, "Итоги построчного и столбцового режимов не совпадают"
+    print(f"Строк: {count}")
+    print(f"Построчно (KassaLedger): {rows_time:.3f} с")
+    print(f"По столбцам (KassaColumns): {columns_time:.3f} с")
+    print("Итоги совпадают.")
+
+
+if __name__ == "__main__":
+    if np is None:
+        print("numpy не установлен: столбцовый режим недоступен.")
+        sys.exit(1)
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50000)
@@ -0,0 +1,92 @@
+"""
+Локальный кэш броней (SQLite): сырой текст поп-апа и разобранная запись по href.
+
+Свежесть: бронь, которую скачали, когда её дата была старше IMMUTABLE_AFTER_DAYS дней,
+считается неизменной и не перекачивается никогда. Недавние и будущие брони живут
+RECENT_TTL секунд, потом скачиваются заново. Размер ограничен MAX_ENTRIES записями,
+лишние вытесняются по давности последнего использования.
+"""
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+
+from core.studios import data_file
+
+CACHE_FILE = data_file('booking_cache.sqlite3')
+IMMUTABLE_AFTER_DAYS = 7
+RECENT_TTL = 3600
+MAX_ENTRIES = 20000
+
+
+class BookingCache:
+    def __init__(self, path=CACHE_FILE, immutable_after_days=IMMUTABLE_AFTER_DAYS,
+                 recent_ttl=RECENT_TTL, max_entries=MAX_ENTRIES):
+        # В конвейере (core/pipeline.py) кэшем пользуется поток загрузки броней, а создаётся он в основном
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.immutable_after = timedelta(days=immutable_after_days)
+        self.recent_ttl = recent_ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS bookings (
+                href TEXT PRIMARY KEY,
+                popup_text TEXT NOT NULL,
+                record TEXT NOT NULL,
+                booking_date TEXT,
+                fetched_at REAL NOT NULL,
+                immutable INTEGER NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS bookings_last_used ON bookings(last_used)")
+        self.conn.commit()
+
+    def get_many(self, hrefs):
+        """{href: (popup_text, record)} для свежих записей; устаревшие считаются промахом."""
+        now = time.time()
+        found = {}
+        with self.lock:
+            for href in hrefs:
+                row = self.conn.execute(
+                    "SELECT popup_text, record, fetched_at, immutable FROM bookings WHERE href = ?",
+                    (href,)).fetchone()
+                if row and (row[3] or now - row[2] < self.recent_ttl):
+                    found[href] = (row[0], json.loads(row[1]))
+            if found:
+                self.conn.executemany("UPDATE bookings SET last_used = ? WHERE href = ?",
+                                      [(now, href) for href in found])
+                self.conn.commit()
+        self.hits += len(found)
+        self.misses += len(set(hrefs)) - len(found)
+        return found
+
+    def put(self, href, popup_text, record):
+        now = time.time()
+        booking_date = record.get('booking_date')
+        immutable = False
+        if booking_date:
+            booking_dt = datetime.strptime(booking_date, '%d.%m.%Y')
+            immutable = datetime.fromtimestamp(now) - booking_dt > self.immutable_after
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO bookings VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (href, popup_text, json.dumps(record, ensure_ascii=False), booking_date, now, int(immutable), now))
+            self._evict()
+            self.conn.commit()
+
+    def _evict(self):
+        count = self.conn.execute("SELECT COUNT(*) FROM bookings").fetchone()[0]
+        if count > self.max_entries:
+            self.conn.execute(
+                "DELETE FROM bookings WHERE href IN "
+                "(SELECT href FROM bookings ORDER BY last_used LIMIT ?)", (count - self.max_entries,))
+
+    def report(self):
+        print(f"Кэш броней: из кэша {self.hits}, загружено {self.misses}")
+
+    def close(self):
+        self.conn.close()
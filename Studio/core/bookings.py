@@ -0,0 +1,198 @@
+"""
+Брони за весь период.
+
+Сначала собираются ссылки на брони из расписаний всех дней, затем каждая уникальная
+бронь скачивается и разбирается один раз, и её интервал раскладывается по дням,
+в расписании которых она встретилась (ночная бронь видна в расписании двух дней).
+
+Быстрый путь: бронь, которую можно классифицировать по цвету ячейки и у которой нет
+денег (см. core/schedule.py), берётся из расписания без поп-апа. Часть таких броней
+всё равно скачивается для сверки, а у скачанных броней категория по поп-апу
+сравнивается с категорией по цвету; расхождения выводятся.
+"""
+from datetime import datetime, timedelta
+
+from core.parsing import parse_booking, record_booking_date
+from core.schedule import VERIFY_EVERY, cell_class, schedule_record
+
+
+def booking_interval(record, fallback_date):
+    """Начало и конец брони (datetime) или None, если время не распознано."""
+    if not (record['start'] and record['end']):
+        return None
+    start_t = datetime.strptime(record['start'], '%H:%M').time()
+    end_t = datetime.strptime(record['end'], '%H:%M').time()
+    # Если дату брони не удалось извлечь, считаем, что она в день расписания
+    booking_date = record_booking_date(record) or fallback_date
+    actual_start = datetime.combine(booking_date.date(), start_t)
+    actual_end = datetime.combine(booking_date.date(), end_t)
+    # Ночная бронь: конец раньше начала
+    if actual_end <= actual_start:
+        actual_end += timedelta(days=1)
+    return actual_start, actual_end
+
+
+def split_hours(record, day_dt):
+    """(часы брони в пределах дня day_dt, полная длительность брони)."""
+    interval = booking_interval(record, day_dt)
+    if interval is None:
+        hours = record['declared_hours'] or 0
+        return hours, hours
+    actual_start, actual_end = interval
+    full_hours = (actual_end - actual_start).total_seconds() / 3600
+
+    day_start_dt = datetime.combine(day_dt.date(), datetime.min.time())
+    day_end_dt = day_start_dt + timedelta(days=1)
+    overlap_start = max(actual_start, day_start_dt)
+    overlap_end = min(actual_end, day_end_dt)
+    if overlap_end > overlap_start:
+        hours_in_day = (overlap_end - overlap_start).total_seconds() / 3600
+    else:
+        hours_in_day = 0.0
+    # Округляем до целого, как было в старом коде
+    return round(hours_in_day), full_hours
+
+
+class PeriodBookings:
+    def __init__(self):
+        self.cells_by_day = {}   # datetime дня -> ячейки расписания (см. core/schedule.py)
+        self.hrefs_by_day = {}   # datetime дня -> set(href)
+        self.records = {}        # href -> (popup_text, record)
+
+    def add_day(self, day_dt, cells):
+        self.cells_by_day[day_dt] = cells
+        self.hrefs_by_day[day_dt] = {cell['href'] for cell in cells if cell['href']}
+
+    def restore_day(self, day_dt, records):
+        """День из контрольной точки (core/checkpoint.py): брони уже разобраны, расписание не нужно."""
+        self.cells_by_day[day_dt] = []
+        self.hrefs_by_day[day_dt] = set(records)
+        self.records.update(records)
+
+    def unique_hrefs(self):
+        return set().union(*self.hrefs_by_day.values())
+
+    def first_day(self, href):
+        """Первый день периода, в расписании которого встретилась бронь."""
+        # list(): в конвейере дни добавляются из другого потока
+        return min(day for day, hrefs in list(self.hrefs_by_day.items()) if href in hrefs)
+
+    def cells_by_href(self):
+        """{href: [(datetime дня, ячейка), ...]} по всем дням периода."""
+        result = {}
+        for day, cells in sorted(self.cells_by_day.items()):
+            for cell in cells:
+                if cell['href']:
+                    result.setdefault(cell['href'], []).append((day, cell))
+        return result
+
+    def schedule_records(self, rules):
+        """Записи броней, которые можно взять из расписания без поп-апа: {href: record}."""
+        records = {}
+        for href, cells in self.cells_by_href().items():
+            record = schedule_record(cells, rules)
+            if record is not None:
+                records[href] = record
+        return records
+
+    def fetch(self, fetcher, booking_cache=None, fast_path=True, verify_every=VERIFY_EVERY, hrefs=None,
+              schedule_model=None, on_record=None):
+        """
+        Скачивает (или берёт из кэша) и разбирает каждую уникальную бронь периода один раз.
+        Записи броней быстрого пути хранятся с popup_text = None. Быстрый путь работает
+        только с schedule_model, которая учится на каждой брони, разобранной по поп-апу.
+        on_record(href, popup_text, record) вызывается для каждой готовой брони (контрольная точка).
+        hrefs — только эти брони (конвейер, core/pipeline.py), по умолчанию все брони периода.
+        """
+        if hrefs is None:
+            # Брони дней из контрольной точки уже разобраны
+            hrefs = self.unique_hrefs() - self.records.keys()
+            total_cells = sum(len(day_hrefs) for day_hrefs in self.hrefs_by_day.values())
+            print(f"Броней за период: {len(hrefs)} уникальных (в расписаниях дней: {total_cells})")
+        hrefs = set(hrefs)
+
+        rules = schedule_model.rules() if schedule_model else {'colors': {}, 'slot_minutes': None}
+        from_schedule = self.schedule_records(rules) if fast_path else {}
+        from_schedule = {href: record for href, record in from_schedule.items() if href in hrefs}
+        to_verify = set(sorted(from_schedule)[::verify_every]) if verify_every else set()
+        need_popup = hrefs - (from_schedule.keys() - to_verify)
+        cells = self.cells_by_href()
+        mismatches = []
+
+        cached = booking_cache.get_many(need_popup) if booking_cache else {}
+        prefetched = fetcher.prefetch(need_popup - cached.keys())
+        for href in sorted(hrefs):
+            try:
+                if href not in need_popup:
+                    self.records[href] = (None, from_schedule[href])
+                    if on_record:
+                        on_record(href, None, from_schedule[href])
+                    continue
+                if href in cached:
+                    popup_text, record = cached[href]
+                else:
+                    popup_text = prefetched[href] if href in prefetched else fetcher.get_text(href)
+                    record = parse_booking(popup_text)
+                    if booking_cache:
+                        booking_cache.put(href, popup_text, record)
+                self.records[href] = (popup_text, record)
+                if on_record:
+                    on_record(href, popup_text, record)
+                if schedule_model:
+                    schedule_model.observe(href, cells.get(href, []), record)
+                mismatch = self._compare_with_schedule(record, cells.get(href, []), from_schedule.get(href), rules)
+                if mismatch:
+                    mismatches.append((href, mismatch))
+            except Exception as e:
+                print(f"Ошибка при обработке брони {href}: {e}")
+
+        if fast_path:
+            print(f"Быстрый путь: без поп-апа {len(from_schedule) - len(to_verify)}, "
+                  f"сверено по поп-апу {len(to_verify)}, расхождений {len(mismatches)}")
+            for href, mismatch in mismatches:
+                print(f"Расхождение расписания и поп-апа для {href}: {mismatch}")
+
+    @staticmethod
+    def _compare_with_schedule(record, cells, schedule_rec, rules):
+        """Описание расхождения брони из поп-апа с её ячейками расписания или None."""
+        for _, cell in cells:
+            color_cls = cell_class(cell, rules)
+            if color_cls is not None and color_cls != record['class']:
+                return f"цвет {cell['color']} -> {color_cls}, по поп-апу {record['class']}"
+        if schedule_rec is not None:
+            day = record_booking_date(schedule_rec)
+            schedule_hours = split_hours(schedule_rec, day)[1]
+            popup_hours = split_hours(record, day)[1]
+            if abs(schedule_hours - popup_hours) > 0.01:
+                return f"часы по сетке {round(schedule_hours, 1)}, по поп-апу {round(popup_hours, 1)}"
+        return None
+
+    def split_day(self, day):
+        """{href: (часы в этот день, полная длительность)} для броней из расписания дня."""
+        split = {}
+        for href in self.hrefs_by_day.get(day, ()):
+            if href not in self.records:
+                continue
+            try:
+                split[href] = split_hours(self.records[href][1], day)
+            except ValueError as e:
+                print(f"Ошибка при обработке брони {href}: {e}")
+        return split
+
+    def split_all(self):
+        """
+        Один проход по уникальным броням: {день: {href: (часы в этот день, полная длительность)}}
+        для каждого дня, в расписании которого бронь встретилась.
+        """
+        splits = {day: {} for day in self.hrefs_by_day}
+        days_by_href = {}
+        for day, hrefs in self.hrefs_by_day.items():
+            for href in hrefs:
+                days_by_href.setdefault(href, []).append(day)
+        for href, (_, record) in self.records.items():
+            try:
+                for day in days_by_href.get(href, []):
+                    splits[day][href] = split_hours(record, day)
+            except ValueError as e:
+                print(f"Ошибка при обработке брони {href}: {e}")
+        return splits
@@ -0,0 +1,67 @@
+"""
+Запуск Chrome для скриптов студий.
+
+Профиль 'scraper': без окна (работает на сервере без дисплея), без картинок и шрифтов,
+без расширений, page_load_strategy='eager' и постоянный user-data-dir (кэш и cookies
+переживают перезапуск). Профиль 'visible': обычное окно Chrome, как раньше (по умолчанию).
+Песочница Chrome отключается только там, где без неё он не запускается: Linux под root.
+"""
+import os
+import sys
+
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from webdriver_manager.chrome import ChromeDriverManager
+
+from core.studios import DATA_DIR
+
+BROWSER_PROFILES = ('scraper', 'visible')
+DEFAULT_BROWSER_PROFILE = 'visible'
+
+USER_DATA_ROOT = os.path.join(DATA_DIR, 'chrome')
+
+# Ресурсы, которые в профиле 'scraper' не загружаются вовсе.
+# Стили не блокируются: от них зависит видимость элементов, а значит и body.text.
+BLOCKED_URL_PATTERNS = [
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg', '*.ico',
+    '*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot',
+]
+
+
+def needs_no_sandbox():
+    """Chrome под root на Linux (сервер, контейнер) не запускается с песочницей."""
+    return sys.platform.startswith('linux') and hasattr(os, 'geteuid') and os.geteuid() == 0
+
+
+def scraper_options(user_data_dir):
+    options = webdriver.ChromeOptions()
+    options.add_argument('--headless=new')
+    options.add_argument('--disable-gpu')
+    if needs_no_sandbox():
+        options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    options.add_argument('--disable-extensions')
+    options.add_argument('--window-size=1600,1000')
+    options.add_argument(f'--user-data-dir={user_data_dir}')
+    options.add_experimental_option('prefs', {
+        'profile.managed_default_content_settings.images': 2,
+    })
+    options.page_load_strategy = 'eager'
+    return options
+
+
+def start_driver(profile=DEFAULT_BROWSER_PROFILE, profile_name='default'):
+    """
+    Запускает Chrome с выбранным профилем. profile_name разделяет user-data-dir,
+    чтобы скрипты разных студий могли работать одновременно.
+    """
+    service = Service(ChromeDriverManager().install())
+    if profile == 'visible':
+        return webdriver.Chrome(service=service)
+
+    user_data_dir = os.path.join(USER_DATA_ROOT, profile_name)
+    os.makedirs(user_data_dir, exist_ok=True)
+    driver = webdriver.Chrome(service=service, options=scraper_options(user_data_dir))
+    driver.execute_cdp_cmd('Network.enable', {})
+    driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': BLOCKED_URL_PATTERNS})
+    return driver
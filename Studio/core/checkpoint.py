@@ -0,0 +1,140 @@
+"""
+Контрольная точка запуска (SQLite): всё, что собрано, сохраняется сразу, а не только
+в памяти до вопроса о записи:
+- schedules: ячейки расписания дня, как только оно прочитано (этап 1);
+- bookings: разобранная бронь, как только она скачана или взята из расписания (этап 2);
+- days: итоги готового дня и его брони (этап 3).
+
+С --resume для той же студии и того же периода готовые дни не собираются заново,
+расписания сохранённых дней не открываются в браузере, а сохранённые брони не
+скачиваются. Без --resume контрольная точка студии и периода начинается с чистого
+листа. После успешной записи в таблицу она удаляется. Дни, расписание которых не
+загрузилось, не сохраняются — при продолжении их соберут снова.
+"""
+import json
+import sqlite3
+import threading
+import time
+
+from core.studios import data_file
+
+CHECKPOINT_FILE = data_file('run_checkpoint.sqlite3')
+
+# Поля данных дня, которые сохраняются (лист итогов — объект gspread, он находится заново)
+DAILY_FIELDS = ('col', 'col_num', 'daily_hours_totals', 'daily_counts', 'prep_photo', 'fakt_photo',
+                'prep_video', 'fakt_video', 'school', 'dop', 'parking_amount', 'parking_count')
+
+
+def period_key(days):
+    """Ключ периода: 'dd.mm.yyyy-dd.mm.yyyy' по первому и последнему дню."""
+    (d1, m1, y1), (d2, m2, y2) = days[0], days[-1]
+    return f"{d1:02d}.{m1:02d}.{y1}-{d2:02d}.{m2:02d}.{y2}"
+
+
+class RunCheckpoint:
+    def __init__(self, path=CHECKPOINT_FILE):
+        # Сохраняет дни поток итогов конвейера (core/pipeline.py), читает основной поток
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.restored = 0
+        self.saved = 0
+        self.schedules_saved = 0
+        self.bookings_saved = 0
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS days (
+                studio TEXT NOT NULL,
+                period TEXT NOT NULL,
+                day TEXT NOT NULL,
+                daily TEXT NOT NULL,
+                bookings TEXT NOT NULL,
+                saved_at REAL NOT NULL,
+                PRIMARY KEY (studio, period, day)
+            );
+            CREATE TABLE IF NOT EXISTS schedules (
+                studio TEXT NOT NULL,
+                period TEXT NOT NULL,
+                day TEXT NOT NULL,
+                cells TEXT NOT NULL,
+                PRIMARY KEY (studio, period, day)
+            );
+            CREATE TABLE IF NOT EXISTS bookings (
+                studio TEXT NOT NULL,
+                period TEXT NOT NULL,
+                href TEXT NOT NULL,
+                popup_text TEXT,
+                record TEXT NOT NULL,
+                PRIMARY KEY (studio, period, href)
+            );
+        """)
+        self.conn.commit()
+
+    def start(self, studio, period, resume):
+        """
+        Сохранённые дни студии за период: {'dd.mm.yyyy': (данные дня, {href: (popup_text, record)})}.
+        Без resume старая контрольная точка удаляется и возвращается {}.
+        """
+        if not resume:
+            self.clear(studio, period)
+            return {}
+        with self.lock:
+            rows = self.conn.execute("SELECT day, daily, bookings FROM days WHERE studio = ? AND period = ?",
+                                     (studio, period)).fetchall()
+        done = {}
+        for day, daily, bookings in rows:
+            done[day] = (json.loads(daily), {href: tuple(value) for href, value in json.loads(bookings).items()})
+        self.restored += len(done)
+        return done
+
+    def save_day(self, studio, period, day_str, daily, bookings):
+        """bookings: {href: (popup_text, record)} броней из расписания дня."""
+        data = {key: daily[key] for key in DAILY_FIELDS}
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO days VALUES (?, ?, ?, ?, ?, ?)",
+                (studio, period, day_str, json.dumps(data, ensure_ascii=False),
+                 json.dumps(bookings, ensure_ascii=False), time.time()))
+            self.conn.commit()
+        self.saved += 1
+
+    def save_schedule(self, studio, period, day_str, cells):
+        """Ячейки расписания дня (см. core/schedule.py), как только день прочитан."""
+        with self.lock:
+            self.conn.execute("INSERT OR REPLACE INTO schedules VALUES (?, ?, ?, ?)",
+                              (studio, period, day_str, json.dumps(cells, ensure_ascii=False)))
+            self.conn.commit()
+        self.schedules_saved += 1
+
+    def schedules(self, studio, period):
+        """Сохранённые расписания: {'dd.mm.yyyy': ячейки}."""
+        with self.lock:
+            rows = self.conn.execute("SELECT day, cells FROM schedules WHERE studio = ? AND period = ?",
+                                     (studio, period)).fetchall()
+        return {day: json.loads(cells) for day, cells in rows}
+
+    def save_booking(self, studio, period, href, popup_text, record):
+        """Разобранная бронь, как только она получена (popup_text = None — из расписания)."""
+        with self.lock:
+            self.conn.execute("INSERT OR REPLACE INTO bookings VALUES (?, ?, ?, ?, ?)",
+                              (studio, period, href, popup_text, json.dumps(record, ensure_ascii=False)))
+            self.conn.commit()
+        self.bookings_saved += 1
+
+    def bookings(self, studio, period):
+        """Сохранённые брони: {href: (popup_text, record)}."""
+        with self.lock:
+            rows = self.conn.execute("SELECT href, popup_text, record FROM bookings WHERE studio = ? AND period = ?",
+                                     (studio, period)).fetchall()
+        return {href: (popup_text, json.loads(record)) for href, popup_text, record in rows}
+
+    def clear(self, studio, period):
+        with self.lock:
+            for table in ('days', 'schedules', 'bookings'):
+                self.conn.execute(f"DELETE FROM {table} WHERE studio = ? AND period = ?", (studio, period))
+            self.conn.commit()
+
+    def report(self):
+        print(f"Контрольная точка: дней сохранено {self.saved}, взято из прошлого запуска {self.restored}; "
+              f"расписаний сохранено {self.schedules_saved}, броней {self.bookings_saved}")
+
+    def close(self):
+        self.conn.close()
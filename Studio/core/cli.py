@@ -0,0 +1,34 @@
+"""Аргументы командной строки, общие для скриптов студий (см. core/engine.py)."""
+import argparse
+
+from core.browser import BROWSER_PROFILES, DEFAULT_BROWSER_PROFILE
+from core.studios import STUDIOS
+
+
+def parse_args(studio_name):
+    parser = argparse.ArgumentParser(description=f"Сбор броней и кассы для студии {studio_name}")
+    parser.add_argument('--browser', choices=BROWSER_PROFILES, default=DEFAULT_BROWSER_PROFILE,
+                        help="visible (по умолчанию) — обычное окно Chrome; "
+                             "scraper — без окна, без картинок/шрифтов (подходит для сервера)")
+    parser.add_argument('--studio', dest='studios', action='append', choices=list(STUDIOS),
+                        help="студия для обработки (можно указать несколько раз); "
+                             "по умолчанию — студия скрипта")
+    parser.add_argument('--period',
+                        help="период в том же формате, что и при вводе; без него период спрашивается")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="не использовать локальные кэши: брони (booking_cache.sqlite3) "
+                             "и зеркало кассы (kassa_mirror.sqlite3)")
+    parser.add_argument('--no-fast-path', action='store_true',
+                        help="скачивать поп-ап каждой брони, не классифицируя брони по цвету ячейки расписания")
+    parser.add_argument('--pipeline', action='store_true',
+                        help="конвейер: расписания, брони, итоги и запись идут одновременно (core/pipeline.py)")
+    parser.add_argument('--yes', action='store_true',
+                        help="не спрашивать подтверждение записи; с --pipeline месяц записывается, "
+                             "как только собраны все его дни")
+    parser.add_argument('--resume', action='store_true',
+                        help="продолжить прерванный запуск: дни, расписания и брони, сохранённые в "
+                             "run_checkpoint.sqlite3 для тех же студии и периода, не собираются заново")
+    parser.add_argument('--no-store', action='store_true',
+                        help="не сохранять брони и кассу в аналитическую базу studio_analytics.sqlite3; "
+                             "итоги дня считаются в памяти")
+    return parser.parse_args()
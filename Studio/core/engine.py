@@ -0,0 +1,551 @@
+"""
+Общий движок сбора броней и кассы для одной или нескольких студий.
+
+Все студии обрабатываются в одном процессе: один Chrome и один вход в резерватор,
+один клиент Google Sheets и одна открытая финансовая таблица (FIN_ID).
+Для каждой студии: расписания дней -> брони (каждая скачивается один раз) ->
+итоги по дням с кассой; запись в таблицу подтверждается один раз для всех студий.
+
+Все листы Google Sheets, нужные периоду (итоги месяцев, касса), открываются и
+скачиваются в фоновом потоке с самого начала — параллельно со входом в резерватор
+и сбором расписаний; итоги по дням дожидаются их только на этапе 3.
+С --pipeline этапы идут одновременно, день за днём (core/pipeline.py).
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from collections import defaultdict
+from calendar import monthrange
+import os
+
+import gspread
+from oauth2client.service_account import ServiceAccountCredentials
+
+from core.waits import Waiter, show_studio_day, refresh_page
+from core.fetch import PopupFetcher
+from core.browser import start_driver
+from core.cli import parse_args
+from core.session import ensure_logged_in
+from core.parsing import CATEGORY_LABELS, months_ru, parse_booking
+from core.kassa import get_kassa_ledger, load_kassa_months
+from core.kassa_mirror import KassaMirror
+from core.booking_cache import BookingCache
+from core.checkpoint import RunCheckpoint, period_key
+from core.analytics import AnalyticsStore
+from core.bookings import PeriodBookings
+from core.schedule import MODEL_FILE, ScheduleModel, read_schedule_cells
+from core.studios import STUDIOS, STUDIO_ROOT, FIN_ID
+from core.sheets_quota import quota_client
+from core.worksheet_cache import WORKSHEETS
+from core.itogi_writer import column_to_letter, plan_writes, print_preview, write_plans
+
+SELENIUM_WAIT_TIME = 20  # макс. ожидание загрузки расписания (ждём готовности, а не фикс. паузу)
+POPUP_WAIT_TIME = 10     # макс. ожидание текста брони
+FETCH_MODE = 'http'      # 'http' — брони скачиваются по HTTP с cookies браузера, 'browser' — через driver.get
+FETCH_CONCURRENCY = 6    # параллельных HTTP-загрузок броней
+
+SCOPE = ['https://spreadsheets.google.com/feeds', 'https://www.googleapis.com/auth/drive']
+
+
+def parse_period(period_input):
+    """Список дней (day, month, year) по строке периода или None, если формат неверный."""
+    days = []
+    if '-' in period_input and '.' in period_input:
+        start_str, end_str = period_input.split('-')
+        start_day, start_month, start_year = map(int, start_str.split('.'))
+        end_day, end_month, end_year = map(int, end_str.split('.'))
+        current_date = datetime(start_year, start_month, start_day)
+        end_date = datetime(end_year, end_month, end_day)
+        while current_date <= end_date:
+            days.append((current_date.day, current_date.month, current_date.year))
+            current_date += timedelta(days=1)
+    else:
+        parts = period_input.split()
+        if len(parts) == 3 and '-' in parts[0]:
+            start_day, end_day = map(int, parts[0].split('-'))
+            month = int(parts[1])
+            year = int(parts[2])
+            for day in range(start_day, end_day + 1):
+                days.append((day, month, year))
+        elif len(parts) == 2:
+            month = int(parts[0])
+            year = int(parts[1])
+            _, last_day = monthrange(year, month)
+            for day in range(1, last_day + 1):
+                days.append((day, month, year))
+        elif len(parts) == 3:
+            day = int(parts[0])
+            month = int(parts[1])
+            year = int(parts[2])
+            days.append((day, month, year))
+        else:
+            return None
+    return days
+
+
+def sheets_client(key_file):
+    """Клиент gspread, все запросы которого идут через квоту (см. core/sheets_quota.py)."""
+    creds = ServiceAccountCredentials.from_json_keyfile_name(key_file, SCOPE)
+    return quota_client(gspread.authorize(creds))
+
+
+def get_itogi_sheet(fin_workbook, current_date_dt, worksheets=WORKSHEETS):
+    """
+    Лист итогов месяца в общей финансовой таблице (создаётся, если его нет).
+    Листы берутся из общего кэша: метаданные таблицы запрашиваются один раз за запуск.
+    """
+    month_en = current_date_dt.strftime('%B')
+    sheet_name = f'{months_ru[month_en]}{str(current_date_dt.year)[-2:]}'
+    sheet = worksheets.get(fin_workbook, sheet_name)
+    if sheet is None:
+        print(f"Лист итогов '{sheet_name}' не найден. Создание.")
+        sheet = worksheets.create(fin_workbook, sheet_name, rows=100, cols=50)
+    return sheet
+
+
+def period_months(days):
+    """Первые числа всех месяцев периода."""
+    return sorted({datetime(year, month, 1) for _, month, year in days})
+
+
+def prefetch_sheets(client, profiles, days, kassa_mirror=None, store=None):
+    """
+    Фоновая подготовка входных данных из Google Sheets: финансовая таблица и листы
+    итогов всех месяцев периода (недостающие создаются), таблицы и листы кассы студий.
+    """
+    months = period_months(days)
+    fin_workbook = client.open_by_key(FIN_ID)
+    for month_dt in months:
+        get_itogi_sheet(fin_workbook, month_dt)
+    kassa = {}
+    for profile in profiles:
+        kassa_workbook = client.open_by_key(profile['kassa_id'])
+        kassa_cache = {}
+        # Листы кассы всех месяцев периода — одним запросом
+        load_kassa_months(kassa_workbook, kassa_cache, months, kassa_mirror, store)
+        kassa[profile['folder']] = (kassa_workbook, kassa_cache)
+    return {'fin_workbook': fin_workbook, 'kassa': kassa}
+
+
+def raise_prefetch_error(sheets_future):
+    """
+    Ошибка фоновой загрузки таблиц (нет доступа к FIN_ID, не создался лист итогов и т. п.)
+    останавливает запуск сразу, а не после сбора всего периода.
+    """
+    if sheets_future is not None and sheets_future.done() and sheets_future.exception() is not None:
+        raise sheets_future.exception()
+
+
+def report_prefetch_error(sheets_future):
+    if sheets_future.exception() is not None:
+        print(f"Ошибка загрузки таблиц Google Sheets: {sheets_future.exception()}. Запуск будет остановлен.")
+
+
+def iter_schedules(driver, waiter, profile, days, driver_lock=None, sheets_future=None):
+    """
+    Расписания дней по очереди: (datetime дня, ячейки расписания или None, если день
+    не загрузился). Дни, которые студия пропускает целиком (record_failed_days=False),
+    тоже отдаются с None. driver_lock — если браузером одновременно пользуется загрузка броней.
+    Перед каждым днём проверяется, не упала ли фоновая загрузка таблиц (sheets_future).
+    """
+    driver_lock = driver_lock or threading.RLock()
+    for day, month, year in days:
+        raise_prefetch_error(sheets_future)
+        current_date_dt = datetime(year=year, month=month, day=day)
+        current_date_str = f"{day:02d}.{month:02d}.{year}"
+        print(f"Processing day {current_date_str}")
+
+        with driver_lock:
+            retry = 0
+            success = False
+            while retry < 3 and not success:
+                try:
+                    show_studio_day(waiter, profile['id'], current_date_str)
+                    success = True
+                except Exception as e:
+                    print(f"Retry {retry+1} for load day {current_date_str} on {profile['name']}: {e}")
+                    retry += 1
+                    refresh_page(waiter)
+
+            if not success:
+                print(f"Failed to load day {current_date_str} after 3 retries. Skip processing bookings.")
+                cells = None
+                # Яуза пропускает такой день целиком, без перезагрузки страницы
+                if profile['record_failed_days']:
+                    refresh_page(waiter)
+            else:
+                # Collect all bookings (вся сетка одним запросом к браузеру)
+                cells = read_schedule_cells(driver, profile['id'])
+                refresh_page(waiter)
+        yield current_date_dt, cells
+
+
+def checkpointed_schedules(driver, waiter, profile, days, checkpoint=None, period=None, **kwargs):
+    """
+    Как iter_schedules(), но расписания, уже сохранённые в контрольной точке (period —
+    ключ периода), берутся из неё без браузера, а каждое прочитанное сохраняется сразу.
+    """
+    if checkpoint is None:
+        yield from iter_schedules(driver, waiter, profile, days, **kwargs)
+        return
+    saved = checkpoint.schedules(profile['folder'], period)
+    to_load = [(d, m, y) for d, m, y in days if f"{d:02d}.{m:02d}.{y}" not in saved]
+    if len(to_load) < len(days):
+        print(f"Расписаний из контрольной точки: {len(days) - len(to_load)}, загрузить: {len(to_load)}")
+    loaded = iter_schedules(driver, waiter, profile, to_load, **kwargs)
+    for day, month, year in days:
+        current_date_str = f"{day:02d}.{month:02d}.{year}"
+        if current_date_str in saved:
+            yield datetime(year=year, month=month, day=day), saved[current_date_str]
+            continue
+        current_date_dt, cells = next(loaded)
+        if cells is not None:
+            checkpoint.save_schedule(profile['folder'], period, current_date_str, cells)
+        yield current_date_dt, cells
+
+
+def checkpoint_records(checkpoint, profile, period, period_bookings):
+    """
+    Брони, сохранённые в контрольной точке, добавляются в period_bookings (их не скачивают
+    заново); возвращает on_record для PeriodBookings.fetch(), сохраняющий каждую новую бронь.
+    """
+    if checkpoint is None:
+        return None
+    period_bookings.records.update(checkpoint.bookings(profile['folder'], period))
+
+    def on_record(href, popup_text, record):
+        checkpoint.save_booking(profile['folder'], period, href, popup_text, record)
+    return on_record
+
+
+def collect_schedules(driver, waiter, profile, days, sheets_future=None, checkpoint=None, period=None):
+    """Этап 1: расписания всех дней периода (ссылки на брони). Возвращает (PeriodBookings, failed_days)."""
+    period_bookings = PeriodBookings()
+    failed_days = set()
+    for current_date_dt, cells in checkpointed_schedules(driver, waiter, profile, days, checkpoint, period,
+                                                         sheets_future=sheets_future):
+        if cells is None:
+            failed_days.add(current_date_dt)
+        else:
+            period_bookings.add_day(current_date_dt, cells)
+    return period_bookings, failed_days
+
+
+def print_day(current_date_str, daily):
+    def pr(name, key):
+        h = round(daily['daily_hours_totals'].get(key, 0.0), 2)
+        c = daily['daily_counts'].get(key, 0)
+        print(f"{name}: {h} ч (бронирований: {c})")
+
+    print(f"Day {current_date_str}:")
+    for name, key in CATEGORY_LABELS:
+        pr(name, key)
+
+    print(f"Предоплаты фото: {daily['prep_photo']} руб.")
+    print(f"Предоплаты видео: {daily['prep_video']} руб.")
+    print(f"По факту фото: {daily['fakt_photo']} руб.")
+    print(f"По факту видео: {daily['fakt_video']} руб.")
+    print(f"Доп. услуги: {daily['dop']} руб.")
+
+    print(f"Парковки сумма: {daily['parking_amount']} руб.; кол-во: {daily['parking_count']}")
+    print(f"Школа по часам: {daily['school']} руб.")
+
+
+def aggregate_day(profile, current_date_dt, period_bookings, day_split, sheets,
+                  total_hours_totals, kassa_mirror=None, store=None, failed=False):
+    """
+    Итоги одного дня студии: часы и брони по категориям, предоплаты, касса.
+    day_split: {href: (часы в этот день, полная длительность)} — см. PeriodBookings.split_all().
+    Со store учтённые брони дня сохраняются в аналитическую базу, и итоги дня берутся
+    SQL-запросом к ней (core/analytics.py). failed — расписание дня не загрузилось:
+    брони дня в базе не перезаписываются, итоги берутся из сохранённых ранее.
+    Печатает блок дня и возвращает данные дня.
+    """
+    studio_name = profile['name']
+    day = current_date_dt.day
+    current_date_str = current_date_dt.strftime('%d.%m.%Y')
+    fin_workbook = sheets['fin_workbook']
+    kassa_workbook, kassa_cache = sheets['kassa'][profile['folder']]
+
+    daily_hours_totals = defaultdict(float)
+    daily_counts = defaultdict(int)
+    daily_total_prepayment_photo = 0
+    daily_total_prepayment_video = 0
+    counted = []  # (href, record, часы в этот день, полная длительность, первый ли день брони)
+
+    for href in sorted(period_bookings.hrefs_by_day.get(current_date_dt, ())):
+        if href not in period_bookings.records or href not in day_split:
+            continue  # ошибка уже выведена на этапе 2
+        popup_text, record = period_bookings.records[href]
+
+        # Бронь из расписания (popup_text = None) уже относится к этой студии
+        if popup_text is not None and studio_name not in popup_text:
+            continue
+
+        cls = record['class']
+
+        if cls == "unknown":
+            print(f"Бронь {href} не классифицирована. Пропуск.")
+            continue
+
+        # Часы брони в пределах дня (ночная бронь делится между днями, см. core/bookings.py)
+        hours_in_day, full_hours = day_split[href]
+
+        daily_hours_totals[cls] += hours_in_day
+        daily_counts[cls] += 1
+
+        print(f"Бронь {href}: {cls}, {round(hours_in_day, 1)} ч (full: {round(full_hours, 1) if full_hours > 0 else 'N/A'} ч)")
+
+        # Prepayment: бронь на два дня учитывается один раз, в первый её день
+        first_day = period_bookings.first_day(href) == current_date_dt
+        counted.append((href, record, hours_in_day, full_hours, first_day))
+        if first_day:
+            prepayment = record['prepayment']
+            if cls == 'photo':
+                daily_total_prepayment_photo += prepayment
+            elif cls == 'video_master':
+                daily_total_prepayment_video += prepayment
+
+    itogi_sheet = get_itogi_sheet(fin_workbook, current_date_dt)
+    # Лист кассы загружается один раз на запуск; со store его итоги считает SQL-запрос к базе
+    kassa_ledger = get_kassa_ledger(kassa_workbook, kassa_cache, current_date_dt, kassa_mirror, store)
+
+    if store is None:
+        kassa = kassa_ledger.day_totals(current_date_str, studio_name)
+    else:
+        if not failed:
+            store.record_day(profile['folder'], current_date_dt, counted)
+        kassa = store.day_totals(profile['folder'], current_date_dt)
+        daily_hours_totals, daily_counts = kassa['daily_hours_totals'], kassa['daily_counts']
+        daily_total_prepayment_photo, daily_total_prepayment_video = kassa['prep_photo'], kassa['prep_video']
+    for cls, hours in daily_hours_totals.items():
+        total_hours_totals[cls] += hours
+
+    # School money for the day
+    daily_school_money = int((daily_hours_totals.get('school_class', 0.0) + daily_hours_totals.get('school_homework', 0.0)) * 600)
+
+    col = column_to_letter(day + 1)  # B for 1, etc.
+
+    # Сохранение данных для пакетной записи
+    daily = {
+        'itogi_sheet': itogi_sheet,
+        'col': col,
+        'col_num': day + 1,
+        'daily_hours_totals': daily_hours_totals,
+        'daily_counts': daily_counts,
+        'prep_photo': daily_total_prepayment_photo,
+        'fakt_photo': kassa['fakt_photo'],
+        'prep_video': daily_total_prepayment_video,
+        'fakt_video': kassa['fakt_video'],
+        'school': daily_school_money,
+        'dop': kassa['dop'],
+        'parking_amount': kassa['parking_amount'],
+        'parking_count': kassa['parking_count'],
+    }
+
+    report_day(profile, current_date_str, daily)
+    return daily
+
+
+def report_day(profile, current_date_str, daily):
+    print_day(current_date_str, daily)
+    print("Обновления для дня:")
+    for key, row_num in profile['financial_rows'].items():
+        print(f"{daily['col']}{row_num}: {daily[key]}")
+
+
+def restore_day(profile, current_date_dt, saved, sheets, total_hours_totals):
+    """Данные дня из контрольной точки (core/checkpoint.py) с листом итогов; печатает блок дня."""
+    current_date_str = current_date_dt.strftime('%d.%m.%Y')
+    print(f"День {current_date_str} взят из контрольной точки.")
+    daily = dict(saved)
+    daily['daily_hours_totals'] = defaultdict(float, daily['daily_hours_totals'])
+    daily['daily_counts'] = defaultdict(int, daily['daily_counts'])
+    daily['itogi_sheet'] = get_itogi_sheet(sheets['fin_workbook'], current_date_dt)
+    for cls, hours in daily['daily_hours_totals'].items():
+        total_hours_totals[cls] += hours
+    report_day(profile, current_date_str, daily)
+    return daily
+
+
+def checkpoint_day(checkpoint, profile, days, current_date_dt, daily, period_bookings):
+    """Сохраняет готовый день и его разобранные брони в контрольную точку."""
+    bookings = {href: period_bookings.records[href]
+                for href in period_bookings.hrefs_by_day.get(current_date_dt, ()) if href in period_bookings.records}
+    checkpoint.save_day(profile['folder'], period_key(days), current_date_dt.strftime('%d.%m.%Y'),
+                        daily, bookings)
+
+
+def print_period_totals(total_hours_totals):
+    print("Общие часы за период:")
+    for name, key in CATEGORY_LABELS:
+        h = round(total_hours_totals.get(key, 0.0), 2)
+        print(f"{name}: {h} ч")
+
+
+def process_studio(profile, days, driver, waiter, fetcher, booking_cache, sheets_future,
+                   fast_path=True, kassa_mirror=None, checkpoint=None, resume=False, store=None,
+                   schedule_model=None):
+    """
+    Все этапы для одной студии. sheets_future — результат prefetch_sheets() в фоновом
+    потоке. Расписания, брони и готовые дни сохраняются в checkpoint по мере сбора;
+    с resume сохранённое не собирается заново. Возвращает (daily_data, total_hours_totals),
+    где daily_data: {дата 'dd.mm.yyyy': данные дня для пакетной записи}.
+    """
+    print(f"--- АВТОМАТИЗАЦИЯ ДЛЯ СТУДИИ: {profile['name']} ---")
+
+    period = period_key(days)
+    done = checkpoint.start(profile['folder'], period, resume) if checkpoint else {}
+    pending = [(d, m, y) for d, m, y in days if f"{d:02d}.{m:02d}.{y}" not in done]
+    if done:
+        print(f"Из контрольной точки: дней {len(done)}, осталось собрать {len(pending)}")
+
+    raise_prefetch_error(sheets_future)
+    period_bookings, failed_days = collect_schedules(driver, waiter, profile, pending, sheets_future,
+                                                     checkpoint, period)
+    for day_str, (_, bookings) in done.items():
+        period_bookings.restore_day(datetime.strptime(day_str, '%d.%m.%Y'), bookings)
+
+    # --- Этап 2: каждая уникальная бронь скачивается и разбирается один раз ---
+    raise_prefetch_error(sheets_future)
+    on_record = checkpoint_records(checkpoint, profile, period, period_bookings)
+    period_bookings.fetch(fetcher, booking_cache, fast_path=fast_path, schedule_model=schedule_model,
+                          on_record=on_record)
+    day_splits = period_bookings.split_all()
+
+    # --- Этап 3: итоги по дням (листы таблиц к этому моменту обычно уже загружены) ---
+    sheets = sheets_future.result()
+    total_hours_totals = defaultdict(float)
+    daily_data = {}
+    for day, month, year in days:
+        current_date_dt = datetime(year=year, month=month, day=day)
+        current_date_str = current_date_dt.strftime('%d.%m.%Y')
+        if current_date_str in done:
+            daily_data[current_date_str] = restore_day(profile, current_date_dt, done[current_date_str][0],
+                                                       sheets, total_hours_totals)
+            continue
+        if current_date_dt in failed_days and not profile['record_failed_days']:
+            continue
+        daily_data[current_date_str] = aggregate_day(
+            profile, current_date_dt, period_bookings, day_splits.get(current_date_dt, {}), sheets,
+            total_hours_totals, kassa_mirror, store, failed=current_date_dt in failed_days)
+        if checkpoint and current_date_dt not in failed_days:
+            checkpoint_day(checkpoint, profile, days, current_date_dt, daily_data[current_date_str],
+                           period_bookings)
+
+    # Общие часы
+    print_period_totals(total_hours_totals)
+
+    return daily_data, total_hours_totals
+
+
+def main(default_studios):
+    """Точка входа скриптов студий: default_studios — ключи STUDIOS, если не задан --studio."""
+    args = parse_args(', '.join(STUDIOS[key]['name'] for key in default_studios))
+    profiles = [STUDIOS[key] for key in (args.studios or default_studios)]
+
+    # --- Google Sheets: один клиент и одна финансовая таблица на все студии ---
+    try:
+        client = sheets_client(os.path.join(STUDIO_ROOT, profiles[0]['folder'], 'google_key.json'))
+    except Exception as e:
+        print(f"Ошибка инициализации gspread: {e}")
+        exit()
+
+    def popup_signature(popup_text: str):
+        """Разобранные поля брони: по ним сверяется текст, полученный по HTTP и через браузер."""
+        return (tuple(p['name'] in popup_text for p in profiles), parse_booking(popup_text))
+
+    sheets_executor = ThreadPoolExecutor(max_workers=1)
+    try:
+        # Request period (до запуска браузера: по нему сразу начинается загрузка таблиц)
+        period_input = (args.period or input("За какое число (формат: dd mm yyyy для дня, mm yyyy для месяца, dd-dd mm yyyy для диапазона, dd.mm.yyyy-dd.mm.yyyy для кросс-месяца): ")).strip()
+        days = parse_period(period_input)
+        if days is None:
+            print("Неверный формат. Выход.")
+            exit()
+
+        booking_cache = None if args.no_cache else BookingCache()
+        kassa_mirror = None if args.no_cache else KassaMirror()
+        checkpoint = RunCheckpoint()
+        store = None if args.no_store else AnalyticsStore()
+        # Цвета и длина строки сетки для быстрого пути; без кэша — только на этот запуск
+        schedule_model = ScheduleModel(None if args.no_cache else MODEL_FILE)
+        # Листы итогов и касса — в фоне, пока идут вход и сбор расписаний
+        sheets_future = sheets_executor.submit(prefetch_sheets, client, profiles, days, kassa_mirror, store)
+        sheets_future.add_done_callback(report_prefetch_error)
+
+        # Инициализация браузера: один Chrome и один вход на все студии
+        driver = start_driver(args.browser, profile_name='_'.join(p['folder'] for p in profiles))
+        waiter = Waiter(driver, timeouts={'schedule': SELENIUM_WAIT_TIME, 'popup': POPUP_WAIT_TIME})
+
+        # Login (сохранённая сессия переиспользуется, форма заполняется только при необходимости)
+        ensure_logged_in(driver, waiter, "Kapr", "vut79k")
+        fetcher = PopupFetcher(driver, waiter, mode=FETCH_MODE, signature=popup_signature,
+                               concurrency=FETCH_CONCURRENCY)
+
+        if args.pipeline:
+            # Импорт здесь: core/pipeline.py сам берёт этапы из этого модуля
+            from core.pipeline import Pipeline
+            pipeline = Pipeline(profiles, days, driver, waiter, fetcher, booking_cache, sheets_future,
+                                fast_path=not args.no_fast_path, kassa_mirror=kassa_mirror,
+                                auto_confirm=args.yes, checkpoint=checkpoint, resume=args.resume,
+                                store=store, schedule_model=schedule_model)
+            results = pipeline.run()
+        else:
+            results = []
+            for profile in profiles:
+                daily_data, _ = process_studio(profile, days, driver, waiter, fetcher, booking_cache,
+                                               sheets_future, fast_path=not args.no_fast_path,
+                                               kassa_mirror=kassa_mirror, checkpoint=checkpoint,
+                                               resume=args.resume, store=store,
+                                               schedule_model=schedule_model)
+                results.append((profile, daily_data))
+
+        if args.pipeline and args.yes:
+            # Месяцы уже записаны по ходу конвейера
+            failed = pipeline.failed
+        else:
+            # Что изменится в таблице (только отличающиеся от текущих значений ячейки)
+            write_plan = plan_writes(results)
+            print_preview(write_plan)
+
+            if args.yes:
+                print("Внести в таблицу? (yes/no): yes (--yes)")
+                confirm = 'yes'
+            else:
+                confirm = input("Внести в таблицу? (yes/no): ").strip().lower()
+            failed = write_plans(write_plan) if confirm == 'yes' else None
+            if failed is None:
+                print("Отменено.")
+        if failed:
+            print(f"НЕ ЗАПИСАНЫ листы: {', '.join(failed)}. Запустите запись за этот период ещё раз.")
+        elif failed is not None:
+            # Всё записано: продолжать этот период больше не нужно
+            for profile in profiles:
+                checkpoint.clear(profile['folder'], period_key(days))
+
+    finally:
+        # Фоновая загрузка должна закончиться до закрытия зеркала кассы
+        sheets_executor.shutdown(wait=True)
+        client.quota.report()
+        if 'waiter' in locals():
+            waiter.report()
+        if 'fetcher' in locals():
+            fetcher.report()
+        if 'booking_cache' in locals() and booking_cache:
+            booking_cache.report()
+            booking_cache.close()
+        if 'schedule_model' in locals():
+            schedule_model.report()
+            schedule_model.close()
+        if 'store' in locals() and store:
+            store.report()
+            store.close()
+        if 'checkpoint' in locals():
+            checkpoint.report()
+            checkpoint.close()
+        if 'kassa_mirror' in locals() and kassa_mirror:
+            kassa_mirror.report()
+            kassa_mirror.close()
+        if 'driver' in locals() and driver:
+            driver.quit()
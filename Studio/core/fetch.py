@@ -0,0 +1,292 @@
+"""
+Получение текста брони (поп-апа) по её href.
+
+Режим 'http': страница скачивается через requests.Session с cookies из авторизованного
+Selenium, текст извлекается из HTML. Режим 'browser': через driver.get(href) во второй
+вкладке, так что страница с расписанием не перезагружается ради каждой брони.
+При любой проблеме HTTP-режима бронь загружается браузером.
+
+prefetch() скачивает брони дня (или всего периода) параллельно: пул потоков, у каждого
+своя сессия, общий ограничитель частоты запросов к одному хосту.
+"""
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from selenium.webdriver.common.by import By
+
+from core.waits import body_contains
+
+POPUP_MARKER = "Дата:"
+HTTP_TIMEOUT = 15
+POOL_SIZE = 10
+MAX_CONCURRENCY = 6          # одновременных HTTP-запросов к резерватору
+RATE_LIMIT_PER_HOST = 8.0    # не больше N запросов в секунду на хост
+
+# Теги, после которых браузер переносит строку
+BLOCK_TAGS = {
+    'address', 'article', 'aside', 'blockquote', 'br', 'center', 'dd', 'div', 'dl', 'dt',
+    'fieldset', 'figcaption', 'figure', 'footer', 'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+    'header', 'hr', 'legend', 'li', 'main', 'nav', 'ol', 'p', 'pre', 'section', 'table',
+    'tbody', 'thead', 'tfoot', 'tr', 'ul',
+}
+CELL_TAGS = {'td', 'th'}
+# Содержимое этих тегов не попадает в body.text
+SKIP_TAGS = {'head', 'script', 'style', 'noscript', 'template', 'select', 'textarea', 'title'}
+VOID_TAGS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta',
+             'source', 'track', 'wbr'}
+
+HIDDEN_STYLE_RE = re.compile(r'display\s*:\s*none|visibility\s*:\s*hidden')
+
+
+class SessionExpired(Exception):
+    pass
+
+
+class HostRateLimiter:
+    """Разносит старты запросов к одному хосту минимум на 1/per_second секунды."""
+
+    def __init__(self, per_second=RATE_LIMIT_PER_HOST):
+        self.interval = 1.0 / per_second if per_second else 0.0
+        self.lock = threading.Lock()
+        self.next_slot = {}
+
+    def wait(self, url):
+        host = urlsplit(url).netloc
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot.get(host, now))
+            self.next_slot[host] = slot + self.interval
+        delay = slot - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+
+class _TextExtractor(HTMLParser):
+    """Приближение WebElement.text для body: блоки с новой строки, скрытое не выводится."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self.skip_tag = None
+        self.skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if self.skip_tag is not None:
+            if tag == self.skip_tag:
+                self.skip_depth += 1
+            return
+        attrs = dict(attrs)
+        hidden = 'hidden' in attrs or HIDDEN_STYLE_RE.search((attrs.get('style') or '').lower())
+        if tag not in VOID_TAGS and (tag in SKIP_TAGS or hidden):
+            self.skip_tag, self.skip_depth = tag, 1
+            return
+        if tag in BLOCK_TAGS:
+            self.parts.append('\n')
+        elif tag in CELL_TAGS:
+            self.parts.append(' ')
+
+    def handle_endtag(self, tag):
+        if self.skip_tag is not None:
+            if tag == self.skip_tag:
+                self.skip_depth -= 1
+                if self.skip_depth == 0:
+                    self.skip_tag = None
+            return
+        if tag in BLOCK_TAGS:
+            self.parts.append('\n')
+        elif tag in CELL_TAGS:
+            self.parts.append(' ')
+
+    def handle_data(self, data):
+        if self.skip_tag is None:
+            self.parts.append(data)
+
+
+def html_to_text(html: str) -> str:
+    parser = _TextExtractor()
+    parser.feed(html)
+    parser.close()
+    raw = ''.join(parser.parts).replace('\xa0', ' ')
+    lines = (' '.join(line.split()) for line in raw.split('\n'))
+    return '\n'.join(line for line in lines if line)
+
+
+def new_session(pool_size=POOL_SIZE):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=2)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def session_from_driver(driver, pool_size=POOL_SIZE):
+    """requests.Session с пулом соединений и cookies/User-Agent текущей сессии браузера."""
+    session = new_session(pool_size)
+    session.headers['User-Agent'] = driver.execute_script("return navigator.userAgent")
+    copy_cookies(driver, session)
+    return session
+
+
+def clone_session(session):
+    """Отдельная сессия с теми же заголовками и cookies (requests.Session не потокобезопасна)."""
+    clone = new_session()
+    clone.headers.update(session.headers)
+    clone.cookies.update(session.cookies)
+    return clone
+
+
+def copy_cookies(driver, session):
+    for cookie in driver.get_cookies():
+        session.cookies.set(cookie['name'], cookie['value'],
+                            domain=cookie.get('domain'), path=cookie.get('path', '/'))
+
+
+def fetch_popup_text(session, href, timeout=HTTP_TIMEOUT):
+    response = session.get(href, timeout=timeout)
+    response.raise_for_status()
+    if '/login' in response.url:
+        raise SessionExpired(f"Перенаправление на логин при загрузке {href}")
+    if 'charset' not in response.headers.get('Content-Type', '').lower():
+        response.encoding = response.apparent_encoding
+    return html_to_text(response.text)
+
+
+class PopupFetcher:
+    """
+    Отдаёт текст брони по href, сам выбирает HTTP или браузер.
+
+    signature: функция text -> кортеж распарсенных полей. Если задана, первая бронь,
+    скачанная по HTTP, дополнительно открывается в браузере; при расхождении полей
+    HTTP-режим отключается до конца прогона.
+    """
+
+    def __init__(self, driver, waiter, mode='http', signature=None,
+                 concurrency=MAX_CONCURRENCY, rate_limit=RATE_LIMIT_PER_HOST):
+        self.driver = driver
+        self.waiter = waiter
+        self.mode = mode
+        self.signature = signature
+        self.session = session_from_driver(driver) if mode == 'http' else None
+        self.verified = signature is None
+        self.popup_handle = None
+        self.concurrency = max(1, concurrency)
+        self.limiter = HostRateLimiter(rate_limit)
+        self.local = threading.local()
+        self.stats_lock = threading.Lock()
+        self.stats = {'http': 0, 'browser': 0}
+        # Браузер один: в конвейере (core/pipeline.py) им же пользуется сбор расписаний
+        self.driver_lock = threading.RLock()
+
+    def prefetch(self, hrefs):
+        """
+        Параллельно скачивает брони по HTTP. Возвращает {href: text} только для успешных;
+        остальные вызывающий код получает через get_text() (браузер, в основном потоке).
+        Порядок обработки результатов задаёт вызывающий код (sorted(hrefs)).
+        """
+        hrefs = sorted(hrefs)
+        result = {}
+        if self.mode != 'http' or not hrefs:
+            return result
+        # Сверка с браузером идёт до параллельной загрузки
+        if not self.verified:
+            href = hrefs.pop(0)
+            try:
+                result[href] = self.get_text(href)
+            except Exception as e:
+                print(f"Ошибка при загрузке брони {href}: {e}")
+            if self.mode != 'http':
+                return result
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            texts = list(pool.map(self._fetch_in_worker, hrefs))
+        result.update((href, text) for href, text in zip(hrefs, texts) if text is not None)
+        return result
+
+    def _fetch_in_worker(self, href):
+        session = getattr(self.local, 'session', None)
+        if session is None:
+            session = self.local.session = clone_session(self.session)
+        self.limiter.wait(href)
+        try:
+            text = fetch_popup_text(session, href)
+        except (SessionExpired, requests.RequestException):
+            return None
+        if POPUP_MARKER not in text:
+            return None
+        with self.stats_lock:
+            self.stats['http'] += 1
+        return text
+
+    def get_text(self, href):
+        text = self._get_http(href) if self.mode == 'http' else None
+        if text is not None and not self.verified:
+            browser_text = self._verify(href, text)
+            if self.mode != 'http':
+                return browser_text
+        if text is None:
+            text = self._get_browser(href)
+        return text
+
+    def _get_http(self, href):
+        for attempt in range(2):
+            self.limiter.wait(href)
+            try:
+                text = fetch_popup_text(self.session, href)
+            except SessionExpired as e:
+                if attempt == 0:
+                    with self.driver_lock:
+                        copy_cookies(self.driver, self.session)
+                    continue
+                print(f"{e}. HTTP-режим отключён, дальше через браузер.")
+                self.mode = 'browser'
+                return None
+            except requests.RequestException as e:
+                print(f"HTTP-ошибка для {href}: {e}. Загружаем через браузер.")
+                return None
+            if POPUP_MARKER not in text:
+                print(f"В ответе для {href} нет '{POPUP_MARKER}'. Загружаем через браузер.")
+                return None
+            self.stats['http'] += 1
+            return text
+        return None
+
+    def _get_browser(self, href):
+        """Бронь открывается в отдельной вкладке, после чтения текста фокус возвращается обратно."""
+        with self.driver_lock:
+            return self._get_browser_locked(href)
+
+    def _get_browser_locked(self, href):
+        schedule_handle = self.driver.current_window_handle
+        if self.popup_handle in self.driver.window_handles:
+            self.driver.switch_to.window(self.popup_handle)
+        else:
+            self.driver.switch_to.new_window('tab')
+            self.popup_handle = self.driver.current_window_handle
+        try:
+            self.driver.get(href)
+            self.stats['browser'] += 1
+            text = self.waiter.until('popup', body_contains(POPUP_MARKER), required=False)
+            if text is None:
+                text = self.driver.find_element(By.TAG_NAME, "body").text
+            return text
+        finally:
+            self.driver.switch_to.window(schedule_handle)
+
+    def _verify(self, href, http_text):
+        self.verified = True
+        browser_text = self._get_browser(href)
+        http_fields = self.signature(http_text)
+        browser_fields = self.signature(browser_text)
+        if http_fields != browser_fields:
+            print(f"HTTP-текст брони {href} разбирается иначе, чем в браузере: "
+                  f"{http_fields} != {browser_fields}. HTTP-режим отключён.")
+            self.mode = 'browser'
+        return browser_text
+
+    def report(self):
+        print(f"Загрузка броней: по HTTP {self.stats['http']}, через браузер {self.stats['browser']}")
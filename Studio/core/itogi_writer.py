@@ -0,0 +1,167 @@
+"""
+Запись итогов периода в финансовую таблицу.
+
+Перед подтверждением блок каждого листа месяца читается одним запросом и
+сравнивается с вычисленными итогами: записываются только изменившиеся ячейки
+(повторный запуск по закрытому месяцу ничего не пишет), а их список выводится.
+
+Ячейки всех дней (и всех студий), которые попадают на один лист месяца, уходят
+одним batch_update прямоугольными диапазонами. Строки между строками профиля
+(в Хохловке 9–12 и 14) и столбцы дней вне периода не трогаются.
+"""
+import gspread
+import gspread.exceptions
+
+# Сколько изменений по листу показывать перед подтверждением
+PREVIEW_LIMIT = 20
+
+
+def column_to_letter(n: int) -> str:
+    """Преобразует числовой индекс столбца (1-based) в буквенное имя."""
+    result = []
+    while n > 0:
+        n -= 1
+        result.append(chr(n % 26 + ord('A')))
+        n //= 26
+    return ''.join(reversed(result))
+
+
+def contiguous_runs(numbers):
+    """[1, 2, 3, 5, 7, 8] -> [(1, 3), (5, 5), (7, 8)]."""
+    runs = []
+    for n in sorted(set(numbers)):
+        if runs and n == runs[-1][1] + 1:
+            runs[-1] = (runs[-1][0], n)
+        else:
+            runs.append((n, n))
+    return runs
+
+
+def day_cells(profile, daily):
+    """{номер строки: значение} для одного дня студии."""
+    cells = {row_num: daily[key] for key, row_num in profile['financial_rows'].items()}
+    for key, row_num in profile['hour_rows'].items():
+        cells[row_num] = round(daily['daily_hours_totals'].get(key, 0.0), 2)
+    return cells
+
+
+def sheet_cells(results):
+    """
+    results: [(profile, daily_data)], daily_data: {дата: данные дня с 'itogi_sheet' и 'col_num'}.
+    Возвращает {название листа: (лист, {(строка, столбец): значение}, {название студии: дней})}.
+    """
+    sheets = {}
+    for profile, daily_data in results:
+        for daily in daily_data.values():
+            sheet = daily['itogi_sheet']
+            _, cells, studios = sheets.setdefault(sheet.title, (sheet, {}, {}))
+            for row_num, value in day_cells(profile, daily).items():
+                cells[(row_num, daily['col_num'])] = value
+            studios[profile['name']] = studios.get(profile['name'], 0) + 1
+    return sheets
+
+
+def cell_ranges(cells):
+    """
+    Ячейки {(строка, столбец): значение} -> диапазоны для batch_update: подряд идущие
+    столбцы, затем подряд идущие строки с теми же столбцами, объединяются в прямоугольники.
+    """
+    by_row = {}
+    for row_num, col in cells:
+        by_row.setdefault(row_num, []).append(col)
+    blocks = []  # [строка начала, строка конца, столбец начала, столбец конца]
+    for row_num in sorted(by_row):
+        for col_start, col_end in contiguous_runs(by_row[row_num]):
+            for block in blocks:
+                if block[1] == row_num - 1 and block[2:] == [col_start, col_end]:
+                    block[1] = row_num
+                    break
+            else:
+                blocks.append([row_num, row_num, col_start, col_end])
+    return [{
+        'range': f"{column_to_letter(col_start)}{row_start}:{column_to_letter(col_end)}{row_end}",
+        'values': [[cells[(row, col)] for col in range(col_start, col_end + 1)]
+                   for row in range(row_start, row_end + 1)],
+    } for row_start, row_end, col_start, col_end in blocks]
+
+
+def same_value(old, new):
+    """Значение в таблице (UNFORMATTED_VALUE) совпадает с вычисленным числом."""
+    if old is None or old == '':
+        return False
+    try:
+        return abs(float(old) - float(new)) < 1e-9
+    except (TypeError, ValueError):
+        return False
+
+
+def read_block(sheet, cells):
+    """Текущие значения {(строка, столбец): значение} в охватывающем ячейки блоке — одним чтением."""
+    rows = [row for row, _ in cells]
+    cols = [col for _, col in cells]
+    top, left = min(rows), min(cols)
+    values = sheet.get(f"{column_to_letter(left)}{top}:{column_to_letter(max(cols))}{max(rows)}",
+                       value_render_option='UNFORMATTED_VALUE')
+    current = {}
+    for i, row_values in enumerate(values):
+        for j, value in enumerate(row_values):
+            current[(top + i, left + j)] = value
+    return current
+
+
+def plan_writes(results):
+    """
+    Сравнивает вычисленные итоги с тем, что уже есть на листах (одно чтение на лист),
+    и оставляет только изменившиеся ячейки. Если лист прочитать не удалось, пишутся все.
+    Возвращает [{'sheet', 'title', 'studios', 'total', 'changes': {(строка, столбец): (было, стало)}}].
+    """
+    plans = []
+    for title, (sheet, cells, studios) in sheet_cells(results).items():
+        try:
+            current = read_block(sheet, cells)
+        except Exception as e:
+            print(f"Не удалось прочитать лист {title} для сравнения ({e}); будут записаны все ячейки.")
+            current = {}
+        changes = {cell: (current.get(cell), value) for cell, value in cells.items()
+                   if not same_value(current.get(cell), value)}
+        plans.append({'sheet': sheet, 'title': title, 'studios': studios,
+                      'total': len(cells), 'changes': changes})
+    return plans
+
+
+def print_preview(plans, limit=PREVIEW_LIMIT):
+    """Краткий список изменений перед подтверждением записи."""
+    for plan in plans:
+        changes = plan['changes']
+        print(f"Лист {plan['title']}: изменится ячеек {len(changes)} из {plan['total']}")
+        for (row_num, col), (old, new) in sorted(changes.items(), key=lambda item: (item[0][1], item[0][0]))[:limit]:
+            print(f"  {column_to_letter(col)}{row_num}: {'пусто' if old in (None, '') else old} -> {new}")
+        if len(changes) > limit:
+            print(f"  ... и ещё {len(changes) - limit}")
+
+
+def write_plans(plans):
+    """
+    Один batch_update на лист, только с изменившимися ячейками.
+    429 повторяется клиентом (core/sheets_quota.py); возвращает названия листов, которые записать не удалось.
+    """
+    failed = []
+    for plan in plans:
+        title = plan['title']
+        studios = ', '.join(f"{name}: дней {count}" for name, count in plan['studios'].items())
+        if not plan['changes']:
+            print(f"Лист {title} ({studios}): изменений нет, запись не нужна.")
+            continue
+        try:
+            plan['sheet'].batch_update(cell_ranges({cell: new for cell, (_, new) in plan['changes'].items()}))
+            print(f"Записано на лист {title} ({studios}): ячеек {len(plan['changes'])}.")
+        except gspread.exceptions.APIError as e:
+            failed.append(title)
+            if 'Quota exceeded' in str(e):
+                print(f"ОШИБКА 429 (Quota exceeded) при записи листа {title}: повторы не помогли.")
+            else:
+                print(f"API Ошибка при записи листа {title}: {e}")
+        except Exception as e:
+            failed.append(title)
+            print(f"Неизвестная ошибка записи в таблицу для листа {title}: {e}")
+    return failed
@@ -0,0 +1,261 @@
+"""
+Касса: строки листа месяца, разобранные один раз в индекс по дате.
+
+Каждая строка листа разбирается при загрузке: сумма, студии из описания, категория
+(доп. услуга/парковка/выручка фото или видео). Итоги дня берутся только по строкам
+этого дня, без прохода по всему листу для каждого дня периода.
+
+Если есть numpy (requirements.txt; np.char работает и в 1.x, и в 2.x), лист обрабатывается по столбцам
+(KassaColumns): итоги всех дней и всех студий месяца считаются сразу, результаты
+те же, что у построчного KassaLedger (см. core/bench_kassa.py).
+"""
+import re
+from collections import defaultdict
+from datetime import datetime
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from core.parsing import months_ru, DOP_KEYS, classify_kassa_row
+from core.studios import STUDIOS
+from core.kassa_mirror import spreadsheet_modified, pad_rows
+from core.worksheet_cache import WORKSHEETS
+
+# Названия студий, по которым строка кассы относится к студии
+STUDIO_TAGS = [profile['name'].lower() for profile in STUDIOS.values()]
+
+_NON_DIGITS_RE = re.compile(r'[^\d]')
+
+
+def parse_amount(row):
+    """Сумма строки кассы (колонка B или D, формат 'р. 1 000') или None."""
+    amount_b = row[1].strip()
+    amount_d = row[3].strip()
+    amount_str = amount_b if amount_b.startswith('р.') else amount_d if amount_d.startswith('р.') else ''
+    if not amount_str:
+        return None
+    try:
+        return int(_NON_DIGITS_RE.sub('', amount_str))
+    except:
+        return None
+
+
+def kassa_entries(rows):
+    """(номер строки листа, запись) для строк кассы с суммой; заголовок пропускается."""
+    for row_num, row in enumerate(rows[1:], start=2):  # Skip header
+        if len(row) < 4: continue
+        amount = parse_amount(row)
+        if amount is None or amount < 0:
+            continue  # Skip negative
+        desc = ' '.join(row[4:]).lower()
+        # Get аналитика (G = row[6])
+        аналитика = row[6].lower() if len(row) > 6 else ''
+        yield row_num, {
+            'date': row[0].strip(),
+            'amount': amount,
+            'studios': frozenset(tag for tag in STUDIO_TAGS if tag in desc),
+            'category': classify_kassa_row(desc, аналитика),
+            'description': desc,
+        }
+
+
+class KassaLedger:
+    def __init__(self, rows):
+        self.by_date = defaultdict(list)  # 'dd.mm.yyyy' -> [запись строки кассы]
+        for _, entry in kassa_entries(rows):
+            self.by_date[entry['date']].append(entry)
+
+    def entries(self, date_str):
+        return self.by_date.get(date_str, [])
+
+    def day_totals(self, date_str, studio_name):
+        """Факт фото/видео, доп. услуги и парковки студии за день."""
+        totals = _empty_totals()
+        studio_tag = studio_name.lower()
+        for entry in self.entries(date_str):
+            if studio_tag not in entry['studios']:
+                continue
+            category = entry['category']
+            if category in ('dop', 'parking'):
+                totals['dop'] += entry['amount']
+                if category == 'parking':
+                    totals['parking_amount'] += entry['amount']
+                    totals['parking_count'] += 1
+            elif category is not None:
+                totals[category] += entry['amount']
+        return totals
+
+
+def _empty_totals():
+    return {'fakt_photo': 0, 'fakt_video': 0, 'dop': 0, 'parking_amount': 0, 'parking_count': 0}
+
+
+def _contains(arr, sub):
+    return np.char.find(arr, sub) >= 0
+
+
+class KassaColumns:
+    """
+    Столбцовый вариант KassaLedger: строки листа -> массивы numpy, поиск подстрок
+    и суммирование по (дата, студия) векторно. Итоги всех дней считаются в __init__.
+    """
+    def __init__(self, rows):
+        rows = [row for row in rows[1:] if len(row) >= 4]  # Skip header
+        self.totals = defaultdict(dict)  # 'dd.mm.yyyy' -> {название студии: итоги}
+        if not rows:
+            return
+
+        col_b = np.char.strip(np.array([row[1] for row in rows], dtype=str))
+        col_d = np.char.strip(np.array([row[3] for row in rows], dtype=str))
+        from_b = np.char.startswith(col_b, 'р.')
+        from_d = ~from_b & np.char.startswith(col_d, 'р.')
+        amount_str = np.where(from_b, col_b, np.where(from_d, col_d, ''))
+
+        # Сумма: только цифры из 'р. 1 000'; одинаковые строки разбираются один раз
+        parsed = {}
+        for s in set(amount_str.tolist()):
+            try:
+                parsed[s] = int(_NON_DIGITS_RE.sub('', s)) if s else -1
+            except ValueError:
+                parsed[s] = -1
+        amounts = np.array([parsed[s] for s in amount_str.tolist()], dtype=np.int64)
+        valid = amounts >= 0
+
+        desc = np.array([' '.join(row[4:]).lower() for row in rows], dtype=str)
+        analytics = np.array([row[6].lower() if len(row) > 6 else '' for row in rows], dtype=str)
+
+        # Категории — те же правила, что в classify_kassa_row
+        is_dop = np.zeros(len(rows), dtype=bool)
+        for k in DOP_KEYS:
+            is_dop |= _contains(desc, k)
+        is_parking = is_dop & (_contains(desc, 'парковк') | _contains(desc, 'парк'))
+        revenue = ~is_dop & _contains(desc, 'выручка')
+        is_photo = revenue & _contains(analytics, 'фото')
+        is_video = revenue & ~is_photo & (_contains(analytics, 'видео') | _contains(analytics, 'мастер'))
+
+        dates, date_idx = np.unique(np.array([row[0].strip() for row in rows], dtype=str),
+                                    return_inverse=True)
+        for tag in STUDIO_TAGS:
+            mask = valid & _contains(desc, tag)
+            sums = {}
+            for name, selected in (('fakt_photo', is_photo), ('fakt_video', is_video),
+                                   ('dop', is_dop), ('parking_amount', is_parking)):
+                sel = mask & selected
+                # Целочисленное суммирование (bincount с weights считает во float)
+                sums[name] = np.zeros(len(dates), dtype=np.int64)
+                np.add.at(sums[name], date_idx[sel], amounts[sel])
+            counts = np.bincount(date_idx[mask & is_parking], minlength=len(dates))
+            for i in np.flatnonzero(np.bincount(date_idx[mask], minlength=len(dates))):
+                totals = {name: int(values[i]) for name, values in sums.items()}
+                totals['parking_count'] = int(counts[i])
+                self.totals[str(dates[i])][tag] = totals
+
+    def day_totals(self, date_str, studio_name):
+        """Факт фото/видео, доп. услуги и парковки студии за день."""
+        return dict(self.totals.get(date_str, {}).get(studio_name.lower()) or _empty_totals())
+
+
+# Столбцовый режим, если есть numpy; иначе построчный индекс
+KASSA_LEDGER = KassaColumns if np is not None else KassaLedger
+
+
+def kassa_sheet_name(current_date_dt):
+    # Имя листа кассы - 'октябрь 2025'
+    return f"{months_ru[current_date_dt.strftime('%B')].lower()} {current_date_dt.year}"
+
+
+def is_current_month(current_date_dt):
+    today = datetime.now()
+    return (current_date_dt.year, current_date_dt.month) >= (today.year, today.month)
+
+
+def a1_range(sheet_name, start_row):
+    """Диапазон A{start_row}:G листа (кавычки в имени листа удваиваются)."""
+    quoted = sheet_name.replace("'", "''")
+    return f"'{quoted}'!A{start_row}:G"
+
+
+def load_kassa_months(kassa_workbook, kassa_cache, month_dts, mirror=None, store=None):
+    """
+    Загружает в kassa_cache листы кассы всех месяцев периода: только столбцы A:G и
+    одним запросом values_batch_get на таблицу (плюс список листов из core/worksheet_cache.py).
+    С mirror листы, которые не менялись, берутся из зеркала, а для текущего
+    месяца скачивается только хвост (core/kassa_mirror.py).
+    С store строки листов сохраняются в аналитическую базу (core/analytics.py), итоги
+    по ним считает SQL, и индекс листа не строится: в kassa_cache для листа — None.
+    """
+    def set_ledger(name, rows):
+        if store is None:
+            kassa_cache[name] = KASSA_LEDGER(rows)
+        else:
+            store.record_kassa(kassa_workbook.id, name, rows)
+            kassa_cache[name] = None
+
+    names = []
+    for dt in month_dts:
+        name = kassa_sheet_name(dt)
+        if name not in kassa_cache and name not in names:
+            names.append(name)
+    if not names:
+        return
+    try:
+        modified = spreadsheet_modified(kassa_workbook) if mirror is not None else None
+        plans = {}
+        for dt in month_dts:
+            name = kassa_sheet_name(dt)
+            if name in names and name not in plans:
+                plans[name] = (mirror.plan(kassa_workbook.id, name, modified, is_current_month(dt))
+                               if mirror is not None else ('full', 1))
+
+        to_fetch = [name for name in names if plans[name][0] != 'cached']
+        fetched = {}
+        if to_fetch:
+            titles = WORKSHEETS.sheets(kassa_workbook)
+            for name in [n for n in to_fetch if n not in titles]:
+                print(f"Лист кассы '{name}' не найден. Данные по Кассе не будут учтены.")
+                set_ledger(name, [])
+            to_fetch = [name for name in to_fetch if name in titles]
+        if to_fetch:
+            response = kassa_workbook.values_batch_get([a1_range(name, plans[name][1]) for name in to_fetch])
+            for name, value_range in zip(to_fetch, response.get('valueRanges', [])):
+                fetched[name] = value_range.get('values', [])
+
+        for name in names:
+            if name in kassa_cache:
+                continue
+            kind, payload = plans[name]
+            if kind == 'cached':
+                rows = payload
+            elif mirror is None:
+                rows = pad_rows(fetched[name])
+            else:
+                rows = mirror.apply(kassa_workbook.id, name, modified, plans[name], fetched[name])
+                if rows is None:
+                    # Лист укоротился: скачиваем целиком
+                    values = kassa_workbook.values_get(a1_range(name, 1)).get('values', [])
+                    rows = mirror.apply(kassa_workbook.id, name, modified, ('full', 1), values)
+            set_ledger(name, rows)
+            print(f"Лист кассы '{name}' успешно загружен.")
+    except Exception as e:
+        for name in names:
+            if name not in kassa_cache:
+                if store is None:
+                    print(f"Ошибка чтения кассы '{name}': {e}. Данные по Кассе не будут учтены.")
+                else:
+                    print(f"Ошибка чтения кассы '{name}': {e}. Используются строки, сохранённые "
+                          f"в аналитической базе при прошлой загрузке.")
+                # Временная ошибка не должна стирать сохранённые строки листа
+                kassa_cache[name] = KASSA_LEDGER([]) if store is None else None
+
+
+def get_kassa_ledger(kassa_workbook, kassa_cache, current_date_dt, mirror=None, store=None):
+    """
+    KassaLedger листа кассы за месяц (разбирается один раз на весь запуск).
+    Со store лист только сохраняется в базу, и возвращается None.
+    """
+    sheet_name = kassa_sheet_name(current_date_dt)
+    if sheet_name not in kassa_cache:
+        load_kassa_months(kassa_workbook, kassa_cache, [current_date_dt], mirror, store)
+    return kassa_cache[sheet_name]
@@ -0,0 +1,119 @@
+"""
+Локальное зеркало листов кассы (SQLite), чтобы не скачивать лист месяца целиком
+при каждом запуске.
+
+- Таблица кассы не менялась с прошлой синхронизации (время изменения файла в Drive) —
+  строки берутся из зеркала без загрузки листа.
+- Текущий месяц: дозагружаются только строки после последней известной, плюс
+  OVERLAP_ROWS последних строк (их могли поправить). Раз в FULL_SYNC_EVERY секунд
+  лист всё равно скачивается целиком — на случай правок и удалений выше.
+- Прошлые месяцы: если таблица менялась, лист скачивается целиком.
+
+Время изменения Drive отдаёт для всей таблицы, а не для листа, поэтому прошлый
+месяц перекачивается после любой правки таблицы — но только если он входит в период.
+
+Само скачивание делает core/kassa.py (load_kassa_months): по plan() всех листов
+периода собирается один batch-запрос, результат сохраняется через apply().
+"""
+import json
+import sqlite3
+import time
+
+from core.studios import data_file
+
+CACHE_FILE = data_file('kassa_mirror.sqlite3')
+OVERLAP_ROWS = 20
+FULL_SYNC_EVERY = 24 * 3600
+# Из листа кассы нужны только столбцы A:G (дата, суммы B/D, описание E-G, аналитика G)
+KASSA_WIDTH = 7
+
+
+def spreadsheet_modified(workbook):
+    """Время последнего изменения таблицы (строка из Drive) или None, если узнать не удалось."""
+    try:
+        return workbook.lastUpdateTime
+    except Exception:
+        return None
+
+
+def pad_rows(rows, width=KASSA_WIDTH):
+    """Приводит строки к ширине A:G: короткие дополняются пустыми ячейками."""
+    return [(list(row) + [''] * width)[:width] for row in rows]
+
+
+class KassaMirror:
+    def __init__(self, path=CACHE_FILE, overlap_rows=OVERLAP_ROWS, full_sync_every=FULL_SYNC_EVERY):
+        # Зеркалом пользуется фоновая загрузка таблиц (core/engine.py), по одному потоку за раз
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.overlap_rows = overlap_rows
+        self.full_sync_every = full_sync_every
+        self.unchanged = 0
+        self.incremental = 0
+        self.full = 0
+        self.rows_fetched = 0
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS kassa_sheets (
+                spreadsheet_id TEXT NOT NULL,
+                sheet_name TEXT NOT NULL,
+                rows TEXT NOT NULL,
+                modified TEXT,
+                full_synced_at REAL NOT NULL,
+                PRIMARY KEY (spreadsheet_id, sheet_name)
+            )
+        """)
+        self.conn.commit()
+
+    def _load(self, spreadsheet_id, sheet_name):
+        row = self.conn.execute(
+            "SELECT rows, modified, full_synced_at FROM kassa_sheets WHERE spreadsheet_id = ? AND sheet_name = ?",
+            (spreadsheet_id, sheet_name)).fetchone()
+        if row is None:
+            return None
+        return {'rows': json.loads(row[0]), 'modified': row[1], 'full_synced_at': row[2]}
+
+    def _save(self, spreadsheet_id, sheet_name, rows, modified, full_synced_at):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO kassa_sheets VALUES (?, ?, ?, ?, ?)",
+            (spreadsheet_id, sheet_name, json.dumps(rows, ensure_ascii=False), modified, full_synced_at))
+        self.conn.commit()
+
+    def plan(self, spreadsheet_id, sheet_name, modified, current_month):
+        """
+        Что нужно скачать для листа: ('cached', строки) — ничего, ('tail', номер строки) —
+        строки начиная с этой, ('full', 1) — лист целиком. current_month — лист текущего
+        месяца, для него допустима дозагрузка хвоста.
+        """
+        stored = self._load(spreadsheet_id, sheet_name)
+        if stored and modified is not None and stored['modified'] == modified:
+            self.unchanged += 1
+            return 'cached', pad_rows(stored['rows'])
+        if stored and current_month and time.time() - stored['full_synced_at'] < self.full_sync_every:
+            return 'tail', max(2, len(stored['rows']) - self.overlap_rows + 1)  # строка 1 — заголовок
+        return 'full', 1
+
+    def apply(self, spreadsheet_id, sheet_name, modified, plan, values):
+        """
+        Сохраняет скачанные по plan() строки; возвращает все строки листа или None,
+        если лист укоротился и его нужно скачать целиком.
+        """
+        kind, start = plan
+        self.rows_fetched += len(values)
+        if kind == 'tail':
+            stored = self._load(spreadsheet_id, sheet_name)
+            if len(values) < len(stored['rows']) - start + 1:
+                return None
+            rows = pad_rows(stored['rows'][:start - 1] + values)
+            self.incremental += 1
+            self._save(spreadsheet_id, sheet_name, rows, modified, stored['full_synced_at'])
+        else:
+            rows = pad_rows(values)
+            self.full += 1
+            self._save(spreadsheet_id, sheet_name, rows, modified, time.time())
+        return rows
+
+    def report(self):
+        print(f"Зеркало кассы: без загрузки {self.unchanged}, дозагрузка {self.incremental}, "
+              f"целиком {self.full}; скачано строк: {self.rows_fetched}")
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,233 @@
+"""
+Разбор текста брони (поп-апа резерватора) и классификация по категориям.
+
+Общий код для обеих студий; parse_booking() собирает все поля брони в одну запись,
+которая хранится в кэше броней (core/booking_cache.py).
+"""
+import re
+from datetime import datetime
+
+from core.keywords import KeywordMatcher
+
+# Локализованные названия месяцев
+months_ru = {
+    'January': 'Январь','February': 'Февраль','March': 'Март','April': 'Апрель',
+    'May': 'Май','June': 'Июнь','July': 'Июль','August': 'Август',
+    'September': 'Сентябрь','October': 'Октябрь','November': 'Ноябрь','December': 'Декабрь'
+}
+
+months_ru_genitive = {
+    'января': 'январь', 'февраля': 'февраль', 'марта': 'март', 'апреля': 'апрель',
+    'мая': 'май', 'июня': 'июнь', 'июля': 'июль', 'августа': 'август',
+    'сентября': 'сентябрь', 'октября': 'октябрь', 'ноября': 'ноябрь', 'декабря': 'декабрь'
+}
+
+months_ru_inv = {v.lower(): k for k, v in months_ru.items()}
+
+
+# --- Canonical mapping (exact from user) ---
+RAW_MAPPING = {
+    'фотосъемка': 'photo',
+    'банкет': 'banquet',
+    'видео съемки/мастер класс': 'video_master',
+    'мероприятие': 'event',
+    'корпоративные клиенты': 'corporate',
+    'фотошкола занятия': 'school_class',
+    'фотошкола домашние работы студентов': 'school_homework',
+    'плавающая бронь': 'floating',
+    'не приехали/не приедут': 'no_show',
+    'тех.бронь': 'tech',
+    'мероприятие бланк': 'event_blank',
+    'мероприятие сися и white studios': 'event_sisia_white',
+    'мероприятия yauza_place': 'yauza_place',
+    'мероприятия crystal': 'crystal'
+}
+# Категории в порядке вывода
+CATEGORY_LABELS = [
+    ("Фотосъемка", "photo"),
+    ("Банкет", "banquet"),
+    ("Видео съемки/Мастер класс", "video_master"),
+    ("Мероприятие", "event"),
+    ("Корпоративные клиенты", "corporate"),
+    ("фотошкола занятия", "school_class"),
+    ("фотошкола домашние работы студентов", "school_homework"),
+    ("Плавающая бронь", "floating"),
+    ("Не приехали/не приедут", "no_show"),
+    ("тех.бронь", "tech"),
+    ("мероприятие бланк", "event_blank"),
+    ("мероприятие Сися и White Studios", "event_sisia_white"),
+    ("мероприятия yauza_place", "yauza_place"),
+    ("мероприятия crystal", "crystal"),
+    ("Неопределённые", "unknown")
+]
+
+DOP_KEYS = ['парковк','цикл','циклорама','фон','улице','парк', 'отпар', 'аренда', 'улиц', 'раннее', 'позднее', 'стойк', 'источник']
+ORDERED_KEYS = sorted(RAW_MAPPING.keys(), key=lambda s: len(s), reverse=True)
+
+# Подсказки для эвристик classify_from_text (шаг 4)
+VIDEO_HINTS = {'видео', 'мастер', 'мастеркласс'}
+SCHOOL_HINTS = {'школ', 'занятия', 'домашние'}
+HOMEWORK_HINTS = {'домаш', 'домашние'}
+CORPORATE_HINTS = {'корпор', 'корп'}
+EVENT_HINTS = {'мероприяти', 'yauza', 'crystal', 'сися', 'white studios'}
+SISIA_HINTS = {'сися', 'white studios'}
+
+# Все ключевые слова классификации ищутся одним проходом по тексту (см. core/keywords.py)
+BOOKING_MATCHER = KeywordMatcher(
+    list(RAW_MAPPING) + DOP_KEYS + list(VIDEO_HINTS | SCHOOL_HINTS | HOMEWORK_HINTS | CORPORATE_HINTS
+                                        | EVENT_HINTS | SISIA_HINTS) + ['floating', 'no_show', 'tech'])
+# Строки кассы: доп. услуги, парковки и выручка
+KASSA_MATCHER = KeywordMatcher(DOP_KEYS + ['парковк', 'парк', 'выручка'])
+
+
+# --- Parsers and classifiers ---
+# Шаблоны компилируются один раз: при пересчёте тысяч броней из кэша это заметно
+_WS_RE = re.compile(r'\s+')
+_START_END_RE = re.compile(r'(?:с|c)\s*(\d{1,2}:\d{2}).*?до\s*(\d{1,2}:\d{2})')
+_HOURS_RE = re.compile(r'кол-?во\s*часов[:\s]*([\d]+)')
+_HOURS_FULL_RE = re.compile(r'количество\s+часов[:\s]*([\d]+)')
+_PREPAID_RE = re.compile(r'(\d+)\s*руб\.')
+# Ищем <big>Дата: ДД месяц ГГГГ</big>
+_DATE_RE = re.compile(r'дата:\s*(\d{1,2})\s*(\w+)\s*(\d{4})')
+
+# Название месяца (именительный или родительный падеж, строчными) -> номер
+MONTH_NUMBERS = {name: i + 1 for i, name in enumerate(months_ru_inv)}
+MONTH_NUMBERS.update({gen: MONTH_NUMBERS[nom] for gen, nom in months_ru_genitive.items()})
+
+
+def _start_end(low: str):
+    m = _START_END_RE.search(_WS_RE.sub(' ', low))
+    if not m:
+        return None, None
+    s, e = m.group(1), m.group(2)
+    if len(s) == 4: s = '0' + s
+    if len(e) == 4: e = '0' + e
+    return s, e
+
+
+def _date_from_match(m):
+    month = MONTH_NUMBERS.get(m.group(2))
+    # Если не нашли месяц (например, из-за ошибки в тексте)
+    if month is None:
+        return None
+    try:
+        return datetime(int(m.group(3)), month, int(m.group(1)))
+    except ValueError:
+        return None
+
+
+def _scan_lines(low: str):
+    """
+    Один проход по непустым строкам текста (уже в нижнем регистре):
+    (заявленные часы, следующая за ними строка, предоплата, дата брони).
+    Для каждого поля берётся первая подходящая строка.
+    """
+    lines = [ln.strip() for ln in low.splitlines() if ln.strip()]
+    hours_found = prepaid_found = date_found = False
+    hours = next_line = booking_date = None
+    prepayment = 0
+    for i, ln in enumerate(lines):
+        if not hours_found:
+            m = _HOURS_RE.search(ln) or _HOURS_FULL_RE.search(ln)
+            if m:
+                hours_found = True
+                try:
+                    hours = int(m.group(1))
+                except:
+                    hours = None
+                next_line = lines[i+1] if i+1 < len(lines) else None
+        if not prepaid_found and 'итого оплачено' in ln:
+            m = _PREPAID_RE.search(ln)
+            if m:
+                prepaid_found = True
+                prepayment = int(m.group(1))
+        if not date_found:
+            m = _DATE_RE.search(ln)
+            if m:
+                date_found = True
+                booking_date = _date_from_match(m)
+        if hours_found and prepaid_found and date_found:
+            break
+    return hours, next_line, prepayment, booking_date
+
+
+def _classify(low: str, next_line):
+    # 1) use declared next line if present (ordered keys)
+    if next_line:
+        k = KeywordMatcher.first(ORDERED_KEYS, BOOKING_MATCHER.present(next_line))
+        if k:
+            return RAW_MAPPING[k]
+    found = BOOKING_MATCHER.present(low)
+    # 2) scan full text using ordered keys (prefer longer matches)
+    k = KeywordMatcher.first(ORDERED_KEYS, found)
+    if k:
+        return RAW_MAPPING[k]
+    # 3) dop priority
+    if not found.isdisjoint(DOP_KEYS):
+        return 'dop'
+    # 4) conservative heuristics fallback
+    if not found.isdisjoint(VIDEO_HINTS):
+        return 'video_master'
+    if not found.isdisjoint(SCHOOL_HINTS):
+        return 'school_homework' if not found.isdisjoint(HOMEWORK_HINTS) else 'school_class'
+    if not found.isdisjoint(CORPORATE_HINTS):
+        return 'corporate'
+    if not found.isdisjoint(EVENT_HINTS):
+        return 'event_sisia_white' if not found.isdisjoint(SISIA_HINTS) else 'event'
+    if 'floating' in found:
+        return 'floating'
+    if 'no_show' in found:
+        return 'no_show'
+    if 'tech' in found:
+        return 'tech'
+    return 'unknown'
+
+
+def classify_from_text(popup_text: str):
+    low = popup_text.lower()
+    _, next_line, _, _ = _scan_lines(low)
+    return _classify(low, next_line)
+
+
+def classify_kassa_row(desc: str, analytics: str):
+    """
+    Категория строки кассы по описанию и аналитике (оба в нижнем регистре):
+    'parking' / 'dop' (доп. услуги), 'fakt_photo' / 'fakt_video' (выручка) или None.
+    """
+    hits = KASSA_MATCHER.present(desc)
+    if not hits.isdisjoint(DOP_KEYS):
+        return 'parking' if 'парковк' in hits or 'парк' in hits else 'dop'
+    if 'выручка' in hits:
+        if 'фото' in analytics:
+            return 'fakt_photo'
+        if 'видео' in analytics or 'мастер' in analytics:
+            return 'fakt_video'
+    return None
+
+
+def parse_booking(popup_text: str):
+    """
+    Все поля брони одной записью (JSON-совместимой, дата как dd.mm.yyyy).
+    Категория уже с поправкой на "Не приехали". Текст разбирается за один проход по строкам.
+    """
+    low = popup_text.lower()
+    declared_hours, next_line, prepayment, booking_date = _scan_lines(low)
+    cls = _classify(low, next_line)
+    if cls == "unknown" and "Не приехали" in popup_text:
+        cls = "no_show"
+    start, end = _start_end(low)
+    return {
+        'class': cls,
+        'start': start,
+        'end': end,
+        'declared_hours': declared_hours,
+        'next_line': next_line,
+        'prepayment': prepayment,
+        'booking_date': booking_date.strftime('%d.%m.%Y') if booking_date else None,
+    }
+
+
+def record_booking_date(record):
+    if not record.get('booking_date'):
+        return None
+    return datetime.strptime(record['booking_date'], '%d.%m.%Y')
@@ -0,0 +1,234 @@
+"""
+Конвейерный режим (--pipeline): этапы работают одновременно и связаны очередями
+ограниченного размера, так что долгий период занимает max(этап), а не сумму этапов.
+
+  расписания дней (браузер, основной поток)
+    -> брони дня: скачивание и разбор (поток 'fetch')
+    -> итоги дня с кассой (поток 'aggregate')
+    -> запись (поток 'write')
+
+Брони дня скачиваются, когда уже прочитано расписание следующего дня: ночная бронь
+видна в расписаниях двух дней, и её запись (и часы по сетке) должны учитывать оба.
+С --yes каждый месяц студии записывается, как только собраны все его дни; без --yes
+итоги копятся и записываются после общего подтверждения, как в обычном режиме.
+Дни из контрольной точки (--resume) не собираются, а идут по конвейеру в порядке дат;
+сохранённые расписания и брони недоделанных дней тоже берутся из неё.
+"""
+import queue
+import threading
+from collections import defaultdict
+from datetime import datetime
+
+from core.bookings import PeriodBookings
+from core.checkpoint import period_key
+from core.engine import (aggregate_day, checkpoint_day, checkpoint_records, checkpointed_schedules,
+                         print_period_totals, restore_day)
+from core.itogi_writer import plan_writes, print_preview, write_plans
+
+QUEUE_SIZE = 4  # дней в очереди между соседними этапами
+DONE = object()
+
+
+class PipelineAborted(Exception):
+    pass
+
+
+class Pipeline:
+    def __init__(self, profiles, days, driver, waiter, fetcher, booking_cache, sheets_future,
+                 fast_path=True, kassa_mirror=None, auto_confirm=False, queue_size=QUEUE_SIZE,
+                 checkpoint=None, resume=False, store=None, schedule_model=None):
+        self.profiles = profiles
+        self.days = days
+        self.driver = driver
+        self.waiter = waiter
+        self.fetcher = fetcher
+        self.booking_cache = booking_cache
+        self.sheets_future = sheets_future
+        self.fast_path = fast_path
+        self.kassa_mirror = kassa_mirror
+        self.auto_confirm = auto_confirm
+        self.checkpoint = checkpoint
+        self.resume = resume
+        self.store = store
+        self.schedule_model = schedule_model
+        self.to_fetch = queue.Queue(queue_size)
+        self.to_aggregate = queue.Queue(queue_size)
+        self.to_write = queue.Queue(queue_size)
+        self.abort = threading.Event()
+        self.errors = []
+        self.results = {}   # папка студии -> (profile, daily_data)
+        self.failed = []    # листы, которые не удалось записать
+
+    # --- очереди: не блокируются навсегда, если соседний этап упал ---
+    def put(self, q, item):
+        while True:
+            if self.abort.is_set():
+                raise PipelineAborted()
+            try:
+                q.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    def get(self, q):
+        while True:
+            if self.abort.is_set():
+                raise PipelineAborted()
+            try:
+                return q.get(timeout=0.5)
+            except queue.Empty:
+                continue
+
+    def stage(self, name, target):
+        def run():
+            try:
+                target()
+            except PipelineAborted:
+                pass
+            except Exception as e:
+                print(f"Конвейер: ошибка на этапе '{name}': {e}")
+                self.errors.append(e)
+                self.abort.set()
+        return threading.Thread(target=run, name=name, daemon=True)
+
+    # --- этапы ---
+    def discover(self):
+        """Расписания дней всех студий по очереди; браузер делится с загрузкой броней."""
+        for profile in self.profiles:
+            print(f"--- АВТОМАТИЗАЦИЯ ДЛЯ СТУДИИ: {profile['name']} ---")
+            period = period_key(self.days)
+            done = self.checkpoint.start(profile['folder'], period, self.resume) if self.checkpoint else {}
+            pending = [(d, m, y) for d, m, y in self.days if f"{d:02d}.{m:02d}.{y}" not in done]
+            if done:
+                print(f"Из контрольной точки: дней {len(done)}, осталось собрать {len(pending)}")
+            self.put(self.to_fetch, ('studio', profile, None, done))
+            for day_dt, cells in checkpointed_schedules(self.driver, self.waiter, profile, pending,
+                                                        self.checkpoint, period,
+                                                        driver_lock=self.fetcher.driver_lock,
+                                                        sheets_future=self.sheets_future):
+                self.put(self.to_fetch, ('day', profile, day_dt, cells))
+        self.put(self.to_fetch, DONE)
+
+    def fetch(self):
+        """Брони дня скачиваются и разбираются, когда прочитан следующий день (или студия кончилась)."""
+        profile = period_bookings = on_record = None
+        waiting = []   # (день, не загрузился ли) — ждут расписания следующего дня
+        restored = []  # дни из контрольной точки, ещё не отданные дальше: (день, данные дня)
+
+        def release_restored(before=None):
+            while restored and (before is None or restored[0][0] < before):
+                day_dt, saved = restored.pop(0)
+                self.put(self.to_aggregate, ('restored', profile, day_dt, saved))
+
+        def release(days):
+            for day_dt, failed in days:
+                release_restored(day_dt)
+                new = period_bookings.hrefs_by_day.get(day_dt, set()) - period_bookings.records.keys()
+                if new:
+                    period_bookings.fetch(self.fetcher, self.booking_cache, fast_path=self.fast_path,
+                                          hrefs=new, schedule_model=self.schedule_model, on_record=on_record)
+                self.put(self.to_aggregate, ('failed' if failed else 'day', profile, day_dt, period_bookings))
+
+        while True:
+            item = self.get(self.to_fetch)
+            if item is DONE or item[0] == 'studio':
+                release(waiting)
+                release_restored()
+                waiting = []
+                if profile is not None:
+                    self.put(self.to_aggregate, ('end', profile, None, None))
+                if item is DONE:
+                    self.put(self.to_aggregate, DONE)
+                    return
+                profile, period_bookings = item[1], PeriodBookings()
+                for day_str, (saved, bookings) in sorted(item[3].items(),
+                                                         key=lambda kv: datetime.strptime(kv[0], '%d.%m.%Y')):
+                    day_dt = datetime.strptime(day_str, '%d.%m.%Y')
+                    period_bookings.restore_day(day_dt, bookings)
+                    restored.append((day_dt, saved))
+                on_record = checkpoint_records(self.checkpoint, profile, period_key(self.days), period_bookings)
+                continue
+            _, _, day_dt, cells = item
+            if cells is None:
+                # День не загрузился: Яуза его пропускает, Хохловка пишет итоги без броней
+                if not profile['record_failed_days']:
+                    continue
+            else:
+                period_bookings.add_day(day_dt, cells)
+            release(waiting)
+            waiting = [(day_dt, cells is None)]
+
+    def aggregate(self):
+        sheets = None
+        totals = None
+        while True:
+            item = self.get(self.to_aggregate)
+            if item is DONE:
+                self.put(self.to_write, DONE)
+                return
+            # payload: PeriodBookings студии или (для 'restored') данные дня из контрольной точки
+            kind, profile, day_dt, payload = item
+            if kind == 'end':
+                print_period_totals(totals or {})
+                totals = None
+                self.put(self.to_write, item)
+                continue
+            if sheets is None:
+                sheets = self.sheets_future.result()
+            totals = totals if totals is not None else defaultdict(float)
+            if kind == 'restored':
+                daily = restore_day(profile, day_dt, payload, sheets, totals)
+            else:
+                daily = aggregate_day(profile, day_dt, payload, payload.split_day(day_dt),
+                                      sheets, totals, self.kassa_mirror, self.store, failed=kind == 'failed')
+                if self.checkpoint and kind == 'day':
+                    checkpoint_day(self.checkpoint, profile, self.days, day_dt, daily, payload)
+            self.put(self.to_write, ('day', profile, day_dt, daily))
+
+    def write(self):
+        """Копит дни студии; с --yes записывает месяц, как только пошёл следующий (или студия кончилась)."""
+        month = None
+        pending = {}
+
+        def flush(profile):
+            if self.auto_confirm and pending:
+                plans = plan_writes([(profile, dict(pending))])
+                print_preview(plans)
+                self.failed.extend(write_plans(plans))
+            pending.clear()
+
+        while True:
+            item = self.get(self.to_write)
+            if item is DONE:
+                return
+            kind, profile, day_dt, daily = item
+            if kind == 'end':
+                flush(profile)
+                month = None
+                continue
+            if month is not None and (day_dt.year, day_dt.month) != month:
+                flush(profile)
+            month = (day_dt.year, day_dt.month)
+            date_str = day_dt.strftime('%d.%m.%Y')
+            pending[date_str] = daily
+            self.results.setdefault(profile['folder'], (profile, {}))[1][date_str] = daily
+
+    def run(self):
+        """Возвращает [(profile, daily_data)] в порядке студий, как цикл по process_studio()."""
+        threads = [self.stage('fetch', self.fetch), self.stage('aggregate', self.aggregate),
+                   self.stage('write', self.write)]
+        for thread in threads:
+            thread.start()
+        try:
+            self.discover()
+        except PipelineAborted:
+            pass
+        except BaseException:
+            self.abort.set()
+            raise
+        finally:
+            for thread in threads:
+                thread.join()
+        if self.errors:
+            raise self.errors[0]
+        return [self.results.get(profile['folder'], (profile, {})) for profile in self.profiles]
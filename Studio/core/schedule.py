@@ -0,0 +1,229 @@
+"""
+Чтение расписания студии одним вызовом execute_script.
+
+Вместо find_elements + find_element("a") + get_attribute("href") на каждую ячейку
+(по запросу к WebDriver на каждый вызов) скрипт в браузере обходит всю сетку
+#studioBody{ID} и возвращает JSON-массив ячеек броней.
+
+Быстрый путь (бронь по ячейке, без поп-апа) не знает заранее ни цветов категорий,
+ни длины строки сетки: ScheduleModel выводит их из броней, разобранных по поп-апу.
+Пока наблюдений мало или они расходятся, все брони идут через поп-ап.
+"""
+import json
+import re
+import sqlite3
+import threading
+from collections import Counter, defaultdict
+
+from core.studios import data_file
+
+# Для каждой ячейки .reserved: ссылка, текст, inline-цвет фона и положение в сетке.
+# slot — текст первой ячейки строки (время начала слота).
+SCHEDULE_CELLS_JS = """
+var body = document.getElementById('studioBody' + arguments[0]);
+if (!body) { return '[]'; }
+var cells = [];
+body.querySelectorAll('.reserved').forEach(function (el) {
+    var link = el.querySelector('a');
+    var tr = el.closest('tr');
+    var color = el.style.backgroundColor;
+    if (!color && link) { color = link.style.backgroundColor; }
+    cells.push({
+        href: link ? link.href : null,
+        text: (el.innerText || '').trim(),
+        color: color || null,
+        row: tr ? tr.rowIndex : null,
+        col: el.cellIndex === undefined ? null : el.cellIndex,
+        rowspan: el.rowSpan || 1,
+        slot: tr && tr.cells.length ? (tr.cells[0].innerText || '').trim() : null
+    });
+});
+return JSON.stringify(cells);
+"""
+
+_RGB_RE = re.compile(r'rgba?\((\d+),\s*(\d+),\s*(\d+)')
+
+
+def normalize_color(color):
+    """'rgb(255, 0, 0)' / '#ff0000' -> '#FF0000'; None, если цвета нет."""
+    if not color:
+        return None
+    m = _RGB_RE.match(color.strip())
+    if m:
+        return '#' + ''.join(f'{int(c):02X}' for c in m.groups())
+    return color.strip().upper()
+
+
+def read_schedule_cells(driver, studio_id):
+    """Ячейки броней расписания студии, которое сейчас открыто: список dict (href, text, color, row, col, rowspan, slot)."""
+    cells = json.loads(driver.execute_script(SCHEDULE_CELLS_JS, studio_id) or '[]')
+    for cell in cells:
+        cell['color'] = normalize_color(cell['color'])
+    return cells
+
+
+# --- Быстрый путь: классификация по ячейке расписания без поп-апа ---
+
+MODEL_FILE = data_file('schedule_model.sqlite3')
+# Категории, для которых из поп-апа берётся предоплата; для них поп-ап скачивается всегда
+MONEY_CLASSES = {'photo', 'video_master'}
+# Цвет категории и длина строки сетки подтверждаются по последним RECENT_SAMPLES броням:
+# за значение должны быть не меньше MIN_SAMPLES броней и доля AGREEMENT
+MIN_SAMPLES = 20
+RECENT_SAMPLES = 200
+AGREEMENT = 0.95
+# Наблюдений в каждой таблице модели; старые удаляются
+MAX_OBSERVATIONS = 5000
+# Каждая VERIFY_EVERY-я бронь быстрого пути всё равно скачивается для сверки
+VERIFY_EVERY = 10
+
+_SLOT_RE = re.compile(r'^(\d{1,2}):(\d{2})')
+
+
+def time_minutes(value):
+    """'HH:MM' -> минуты от полуночи или None."""
+    m = _SLOT_RE.match(value or '')
+    if not m:
+        return None
+    return int(m.group(1)) * 60 + int(m.group(2))
+
+
+def cell_start_minutes(cell):
+    return time_minutes(cell['slot'])
+
+
+class ScheduleModel:
+    """
+    Цвет ячейки -> категория и длительность строки сетки по броням, разобранным по поп-апу.
+    Наблюдения хранятся по href: повторная загрузка брони заменяет её прежнее наблюдение
+    и делает его самым свежим (rowid растёт с каждым наблюдением). Значение подтверждено,
+    если за него голосует почти всё из последних наблюдений (см. confirmed()), так что
+    одна бронь не по сетке не выключает быстрый путь навсегда, а смена цветов в резерваторе
+    со временем вытесняет старые наблюдения.
+    """
+    def __init__(self, path=MODEL_FILE):
+        # path=None — только на время запуска (--no-cache); брони разбирает и поток конвейера
+        self.conn = sqlite3.connect(path or ':memory:', check_same_thread=False)
+        self.lock = threading.Lock()
+        self.observed = 0
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS color_classes (
+                href TEXT NOT NULL,
+                color TEXT NOT NULL,
+                class TEXT NOT NULL,
+                PRIMARY KEY (href, color)
+            );
+            CREATE TABLE IF NOT EXISTS slot_lengths (
+                href TEXT PRIMARY KEY,
+                minutes INTEGER NOT NULL
+            );
+        """)
+        self.conn.commit()
+
+    def observe(self, href, cells, record):
+        """
+        Бронь, разобранная по поп-апу, и её ячейки [(datetime дня, ячейка), ...].
+        Длина строки — из однодневной брони, начало которой совпало со слотом ячейки;
+        если не совпало (бронь не по сетке), наблюдение 0 — голос против любой длины строки.
+        """
+        if not cells or record['class'] == 'unknown':
+            return
+        colors = {cell['color'] for _, cell in cells if cell['color']}
+        slot = None
+        start, end = time_minutes(record['start']), time_minutes(record['end'])
+        if len(cells) == 1 and start is not None and end is not None:
+            cell = cells[0][1]
+            duration = (end - start) % (24 * 60)
+            if duration and cell_start_minutes(cell) is not None:
+                rowspan = cell['rowspan'] or 1
+                same_start = cell_start_minutes(cell) == start and duration % rowspan == 0
+                slot = duration // rowspan if same_start else 0
+        with self.lock:
+            self.conn.execute("DELETE FROM color_classes WHERE href = ?", (href,))
+            self.conn.executemany("INSERT INTO color_classes VALUES (?, ?, ?)",
+                                  [(href, color, record['class']) for color in colors])
+            if slot is not None:
+                self.conn.execute("INSERT OR REPLACE INTO slot_lengths VALUES (?, ?)", (href, slot))
+            for table in ('color_classes', 'slot_lengths'):
+                self.conn.execute(f"DELETE FROM {table} WHERE rowid <= "
+                                  f"(SELECT MAX(rowid) FROM {table}) - ?", (MAX_OBSERVATIONS,))
+            self.conn.commit()
+        self.observed += 1
+
+    def rules(self):
+        """{'colors': {цвет: категория}, 'slot_minutes': минуты или None} — только подтверждённое."""
+        with self.lock:
+            color_rows = self.conn.execute(
+                "SELECT color, class FROM color_classes ORDER BY rowid DESC").fetchall()
+            slot_rows = self.conn.execute(
+                "SELECT minutes FROM slot_lengths ORDER BY rowid DESC LIMIT ?", (RECENT_SAMPLES,)).fetchall()
+        recent_by_color = defaultdict(list)
+        for color, cls in color_rows:
+            if len(recent_by_color[color]) < RECENT_SAMPLES:
+                recent_by_color[color].append(cls)
+        colors = {}
+        for color, classes in recent_by_color.items():
+            cls = confirmed(classes)
+            if cls is not None:
+                colors[color] = cls
+        slot_minutes = confirmed([minutes for minutes, in slot_rows])
+        return {'colors': colors, 'slot_minutes': slot_minutes or None}
+
+    def report(self):
+        rules = self.rules()
+        colors = ', '.join(f"{color} -> {cls}" for color, cls in sorted(rules['colors'].items())) or 'нет'
+        slot = f"{rules['slot_minutes']} мин" if rules['slot_minutes'] else 'не подтверждена'
+        print(f"Модель расписания: броней по поп-апу {self.observed}, цвета: {colors}, строка сетки: {slot}")
+
+    def close(self):
+        self.conn.close()
+
+
+def confirmed(values):
+    """Значение, за которое не меньше MIN_SAMPLES наблюдений и доля AGREEMENT, иначе None."""
+    if not values:
+        return None
+    value, seen = Counter(values).most_common(1)[0]
+    if seen >= MIN_SAMPLES and seen >= AGREEMENT * len(values):
+        return value
+    return None
+
+
+def cell_class(cell, rules):
+    return rules['colors'].get(cell['color'])
+
+
+def schedule_record(cells, rules):
+    """
+    Запись брони (как у parse_booking) по её ячейкам [(datetime дня, ячейка), ...] или None,
+    если бронь нельзя надёжно классифицировать без поп-апа: неподтверждённый цвет или
+    длина строки, категория с деньгами, разные цвета в разных днях или нераспознанный слот.
+    """
+    if rules['slot_minutes'] is None:
+        return None
+    classes = {cell_class(cell, rules) for _, cell in cells}
+    if len(classes) != 1:
+        return None
+    cls = classes.pop()
+    if cls is None or cls in MONEY_CLASSES:
+        return None
+    starts = []
+    ends = []
+    for day_dt, cell in cells:
+        start_min = cell_start_minutes(cell)
+        if start_min is None:
+            return None
+        starts.append((day_dt, start_min))
+        ends.append((day_dt, start_min + cell['rowspan'] * rules['slot_minutes']))
+    first_day, start_min = min(starts)
+    _, end_min = max(ends)
+    return {
+        'class': cls,
+        'start': f'{start_min // 60 % 24:02d}:{start_min % 60:02d}',
+        'end': f'{end_min // 60 % 24:02d}:{end_min % 60:02d}',
+        'declared_hours': None,
+        'next_line': None,
+        'prepayment': 0,
+        'booking_date': first_day.strftime('%d.%m.%Y'),
+        'source': 'schedule',
+    }
@@ -0,0 +1,92 @@
+"""
+Вход в резерватор с сохранением сессии между запусками.
+
+После логина cookies браузера и адрес главной страницы пишутся в SESSION_FILE.
+При следующем запуске cookies подставляются в браузер и проверяются одним запросом
+главной страницы; форма логина заполняется, только если сессия оказалась недействительной.
+"""
+import json
+import os
+import time
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+
+from core.studios import data_file
+from core.waits import open_page, url_changed
+
+LOGIN_URL = "https://whitestudios.ru/reservator/login/"
+SESSION_FILE = data_file('reservator_session.json')
+SESSION_MAX_AGE = 7 * 24 * 3600
+
+
+def save_session(driver, main_url, path=SESSION_FILE):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    data = {'saved_at': time.time(), 'main_url': main_url, 'cookies': driver.get_cookies()}
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def load_session(path=SESSION_FILE):
+    """Сохранённая сессия или None, если файла нет, он старше SESSION_MAX_AGE или истекли cookies."""
+    try:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    now = time.time()
+    if now - data.get('saved_at', 0) > SESSION_MAX_AGE or not data.get('cookies'):
+        return None
+    if any(c.get('expiry') is not None and c['expiry'] < now for c in data['cookies']):
+        return None
+    return data
+
+
+def is_login_page(driver):
+    return '/login' in driver.current_url or bool(driver.find_elements(By.NAME, "pass"))
+
+
+def restore_session(driver, waiter, path=SESSION_FILE):
+    """Подставляет сохранённые cookies и проверяет их. Возвращает main_url или None."""
+    data = load_session(path)
+    if data is None:
+        return None
+    # Cookies можно выставить только находясь на домене резерватора
+    open_page(waiter, LOGIN_URL)
+    for cookie in data['cookies']:
+        try:
+            driver.add_cookie(cookie)
+        except Exception:
+            continue
+    open_page(waiter, data['main_url'])
+    if is_login_page(driver):
+        return None
+    return data['main_url']
+
+
+def login(driver, waiter, username, password):
+    driver.get(LOGIN_URL)
+    login_field = WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.NAME, "login")))
+    password_field = WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.NAME, "pass")))
+    login_field.send_keys(username)
+    password_field.send_keys(password)
+    driver.find_element(By.CSS_SELECTOR, 'input[type="submit"]').click()
+    waiter.until('login', url_changed(LOGIN_URL), required=False)
+    return driver.current_url
+
+
+def ensure_logged_in(driver, waiter, username, password, path=SESSION_FILE):
+    """Восстанавливает сохранённую сессию, а если она недействительна — логинится и сохраняет новую."""
+    main_url = restore_session(driver, waiter, path)
+    if main_url is not None:
+        print("Сессия резерватора восстановлена, повторный вход не нужен.")
+        return main_url
+    main_url = login(driver, waiter, username, password)
+    if is_login_page(driver):
+        print("Вход в резерватор не удался: снова открыта страница логина.")
+    else:
+        save_session(driver, main_url, path)
+    return main_url
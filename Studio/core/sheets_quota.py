@@ -0,0 +1,117 @@
+"""
+Клиент Google Sheets с учётом квот вместо пауз time.sleep.
+
+Каждый HTTP-запрос gspread проходит через ведро токенов: отдельно для чтения (GET)
+и записи (остальные методы), по READ_PER_MINUTE и WRITE_PER_MINUTE запросов в минуту.
+Пока квота есть, запросы идут без пауз. Ответ 429 (и временные 500/503) повторяется
+с экспоненциальной задержкой со случайным разбросом; если попытки кончились,
+ошибка пробрасывается дальше — запись не теряется молча.
+"""
+import random
+import threading
+import time
+
+import gspread.exceptions
+
+READ_PER_MINUTE = 60   # квота Sheets API: запросов чтения в минуту на пользователя
+WRITE_PER_MINUTE = 60  # запросов записи в минуту на пользователя
+MAX_RETRIES = 6
+BACKOFF_BASE = 2.0     # секунд, удваивается на каждой попытке
+BACKOFF_MAX = 64.0
+RETRY_STATUSES = {429, 500, 503}
+
+
+class TokenBucket:
+    """Не больше per_minute запросов в минуту, с запасом в burst запросов подряд."""
+
+    def __init__(self, per_minute, burst=None):
+        self.rate = per_minute / 60.0
+        self.capacity = burst or per_minute
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Забирает токен; возвращает, сколько секунд пришлось ждать."""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            delay = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    def drain(self):
+        """После 429 квота на стороне Google исчерпана: не тратим оставшиеся токены впустую."""
+        with self.lock:
+            self.tokens = min(self.tokens, 0.0)
+            self.updated = time.monotonic()
+
+
+def status_code(error):
+    response = getattr(error, 'response', None)
+    code = getattr(response, 'status_code', None)
+    if code is None and 'Quota exceeded' in str(error):
+        return 429
+    return code
+
+
+class QuotaGuard:
+    """Обёртка над request() HTTP-клиента gspread: ведро токенов, повторы и счётчики."""
+
+    def __init__(self, read_per_minute=READ_PER_MINUTE, write_per_minute=WRITE_PER_MINUTE,
+                 max_retries=MAX_RETRIES):
+        self.buckets = {'read': TokenBucket(read_per_minute), 'write': TokenBucket(write_per_minute)}
+        self.max_retries = max_retries
+        self.lock = threading.Lock()
+        self.units = {'read': 0, 'write': 0}
+        self.retries = 0
+        self.waited = 0.0
+        self.failed = 0
+
+    def _count(self, kind, waited):
+        with self.lock:
+            self.units[kind] += 1
+            self.waited += waited
+
+    def wrap(self, request):
+        def guarded(method, *args, **kwargs):
+            kind = 'read' if method.upper() == 'GET' else 'write'
+            for attempt in range(self.max_retries + 1):
+                self._count(kind, self.buckets[kind].acquire())
+                try:
+                    return request(method, *args, **kwargs)
+                except gspread.exceptions.APIError as e:
+                    code = status_code(e)
+                    if code not in RETRY_STATUSES or attempt == self.max_retries:
+                        with self.lock:
+                            self.failed += 1
+                        raise
+                    if code == 429:
+                        self.buckets[kind].drain()
+                    delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt) * random.uniform(0.5, 1.5)
+                    print(f"Sheets API ответил {code}, повтор через {delay:.1f} с "
+                          f"(попытка {attempt + 1} из {self.max_retries})")
+                    with self.lock:
+                        self.retries += 1
+                        self.waited += delay
+                    time.sleep(delay)
+        return guarded
+
+    def report(self):
+        print(f"Квота Sheets API: запросов чтения {self.units['read']}, записи {self.units['write']}, "
+              f"повторов {self.retries}, ожидание {self.waited:.1f} с, неудачных запросов {self.failed}")
+
+
+def quota_client(client, guard=None):
+    """
+    Подменяет request() у клиента gspread (gspread 6: client.http_client, 5: сам client),
+    так что через квоту идут все запросы: и клиента, и открытых им таблиц и листов.
+    """
+    guard = guard or QuotaGuard()
+    target = getattr(client, 'http_client', client)
+    target.request = guard.wrap(target.request)
+    client.quota = guard
+    return client
@@ -0,0 +1,70 @@
+"""
+Профили студий для общего движка (core/engine.py).
+
+Студии отличаются только id в резерваторе, названием (по нему фильтруются брони
+и строки кассы), таблицей кассы, строками финансовой таблицы и поведением для дней,
+расписание которых не загрузилось.
+"""
+import os
+import shutil
+
+STUDIO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Локальное состояние (кэши, контрольная точка, аналитическая база, сессия, профиль Chrome):
+# одна папка пользователя — не рабочая папка и не папка программы (в сборке PyInstaller
+# она внутри пакета приложения)
+DATA_DIR = os.path.join(os.path.expanduser('~'), '.studio_analyzer')
+
+
+def data_file(name):
+    """Путь к файлу в DATA_DIR (папка создаётся). Файл, оставшийся в Studio/, переносится."""
+    os.makedirs(DATA_DIR, exist_ok=True)
+    path = os.path.join(DATA_DIR, name)
+    legacy_path = os.path.join(STUDIO_ROOT, name)
+    if not os.path.exists(path) and os.path.isfile(legacy_path):
+        shutil.move(legacy_path, path)
+    return path
+
+# Общая финансовая таблица всех студий
+FIN_ID = '1lgn068NObnej5A0J0Ya4Kxz5JY6tptxKf9dZTf2VXrI'
+
+STUDIOS = {
+    'Hohlovka': {
+        'id': 21,
+        'name': "Хохловка",
+        'folder': 'Hohlovka',
+        'kassa_id': '1gcM0hGf-D2s4-DhOYzpH6R-LCAe0MGRyKCUH3Fry1aQ',
+        # Строки финансовой таблицы (итоги дня)
+        'financial_rows': {
+            'prep_photo': 5, 'fakt_photo': 7, 'prep_video': 6,
+            'fakt_video': 8, 'school': 13, 'dop': 15
+        },
+        # Строки часов по категориям
+        'hour_rows': {
+            'photo': 46, 'banquet': 47, 'video_master': 48, 'event': 49, 'corporate': 50,
+            'school_class': 51, 'school_homework': 52, 'floating': 53, 'no_show': 54,
+            'tech': 55, 'event_blank': 56, 'event_sisia_white': 57, 'yauza_place': 58,
+            'crystal': 59, 'unknown': 60
+        },
+        # День, расписание которого не загрузилось, всё равно записывается (нулями и кассой)
+        'record_failed_days': True,
+    },
+    'Yauza': {
+        'id': 32,
+        'name': "Яуза",
+        'folder': 'Yauza',
+        'kassa_id': '1biAzb8vVeaTsClkozuViWdxqQ10Bo5NI93SLtvZy1bk',
+        'financial_rows': {
+            'prep_photo': 26, 'fakt_photo': 28, 'prep_video': 27,
+            'fakt_video': 29, 'school': 34, 'dop': 36
+        },
+        'hour_rows': {
+            'photo': 62, 'banquet': 63, 'video_master': 64, 'event': 65, 'corporate': 66,
+            'school_class': 67, 'school_homework': 68, 'floating': 69, 'no_show': 70,
+            'tech': 71, 'event_blank': 72, 'event_sisia_white': 73, 'yauza_place': 74,
+            'crystal': 75, 'unknown': 76
+        },
+        # День, расписание которого не загрузилось, пропускается целиком
+        'record_failed_days': False,
+    },
+}
@@ -0,0 +1,83 @@
+"""
+Проверка: запуск, прерванный на этапе 1 (сбор расписаний), с --resume не открывает
+заново уже прочитанные расписания и даёт те же итоги, что и запуск без сбоя, —
+в обычном режиме и в конвейере.
+
+Запуск: python core/test_checkpoint.py (или pytest). Нужны установленные зависимости
+проекта (selenium, gspread), как для core/test_pipeline.py.
+"""
+import os
+import sys
+import tempfile
+from datetime import datetime
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+for module in ('selenium', 'gspread', 'oauth2client', 'webdriver_manager', 'requests'):
+    pytest.importorskip(module)
+
+import core.engine as engine
+import core.pipeline as pipeline
+from core.checkpoint import RunCheckpoint, period_key
+from core.studios import STUDIOS
+from core.test_pipeline import DAYS, FakeFetcher, comparable, fake_engine, fake_period, fake_schedules
+
+ABORT_DAY = datetime(2026, 1, 25)
+
+
+class BrowserHang(Exception):
+    pass
+
+
+def aborting_schedules(schedules, loaded):
+    """Как fake_schedules, но «браузер зависает» на ABORT_DAY."""
+    def iter_schedules(driver, waiter, profile, days, **kwargs):
+        for day_dt, cells in fake_schedules(schedules, loaded)(driver, waiter, profile, days):
+            if day_dt == ABORT_DAY:
+                raise BrowserHang()
+            yield day_dt, cells
+    return iter_schedules
+
+
+def run(profile, texts, sheets_future, checkpoint, resume, use_pipeline):
+    if use_pipeline:
+        return pipeline.Pipeline([profile], DAYS, None, None, FakeFetcher(texts), None, sheets_future,
+                                 fast_path=False, checkpoint=checkpoint, resume=resume).run()
+    return [(profile, engine.process_studio(profile, DAYS, None, None, FakeFetcher(texts), None, sheets_future,
+                                            fast_path=False, checkpoint=checkpoint, resume=resume)[0])]
+
+
+@pytest.mark.parametrize('use_pipeline', [False, True])
+def test_resume_after_abort_in_schedule_collection(use_pipeline):
+    texts, schedules = fake_period()
+    profile = STUDIOS['Hohlovka']
+    with fake_engine(fake_schedules(schedules)) as sheets_future:
+        expected = run(profile, texts, sheets_future, None, False, False)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        checkpoint = RunCheckpoint(os.path.join(tmp, 'run_checkpoint.sqlite3'))
+        try:
+            loaded = []
+            with fake_engine(aborting_schedules(schedules, loaded)) as sheets_future:
+                with pytest.raises(BrowserHang):
+                    run(profile, texts, sheets_future, checkpoint, False, use_pipeline)
+            # Прочитанные до сбоя расписания уже сохранены (день, который не загрузился, — нет)
+            saved = checkpoint.schedules(profile['folder'], period_key(DAYS))
+            assert len(saved) == len([day for day in loaded if day < ABORT_DAY and schedules[day] is not None])
+
+            loaded = []
+            with fake_engine(fake_schedules(schedules, loaded)) as sheets_future:
+                results = run(profile, texts, sheets_future, checkpoint, True, use_pipeline)
+            assert comparable(results) == comparable(expected)
+            # Заново открываются только несохранённые дни: не загрузившийся и дни после сбоя
+            assert loaded == [day for day in sorted(schedules)
+                              if day >= ABORT_DAY or schedules[day] is None]
+        finally:
+            checkpoint.close()
+
+
+if __name__ == "__main__":
+    for use_pipeline in (False, True):
+        test_resume_after_abort_in_schedule_collection(use_pipeline)
+    print("Продолжение после сбоя на этапе 1 не собирает сохранённые расписания заново.")
@@ -0,0 +1,113 @@
+"""
+Проверка: классификация броней и строк кассы через KeywordMatcher совпадает
+с прежней реализацией (последовательные проверки "k in low").
+
+Запуск: python core/test_classifier.py (или pytest).
+Образцы — тексты поп-апов из debug_popups.txt и случайные тексты из их кусков
+и ключевых слов.
+"""
+import os
+import random
+import re
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.parsing import (RAW_MAPPING, ORDERED_KEYS, DOP_KEYS, classify_from_text,
+                          classify_kassa_row)
+from core.studios import STUDIO_ROOT
+
+RANDOM_SAMPLES = 5000
+
+
+# --- Прежняя реализация (эталон) ---
+def legacy_extract_next_line(popup_text):
+    lines = [ln.strip() for ln in popup_text.splitlines() if ln.strip()]
+    for i, ln in enumerate(lines):
+        low = ln.lower()
+        m = re.search(r'кол-?во\s*часов[:\s]*([\d]+)', low) or re.search(r'количество\s+часов[:\s]*([\d]+)', low)
+        if m:
+            return lines[i+1].strip().lower() if i+1 < len(lines) else None
+    return None
+
+def legacy_classify_from_text(popup_text):
+    low = popup_text.lower()
+    next_line = legacy_extract_next_line(popup_text)
+    if next_line:
+        for k in ORDERED_KEYS:
+            if k in next_line:
+                return RAW_MAPPING[k]
+    for k in ORDERED_KEYS:
+        if k in low:
+            return RAW_MAPPING[k]
+    for k in DOP_KEYS:
+        if k in low:
+            return 'dop'
+    if any(x in low for x in ['видео','мастер','мастеркласс']):
+        return 'video_master'
+    if any(x in low for x in ['школ','занятия','домашние']):
+        return 'school_homework' if 'домаш' in low or 'домашние' in low else 'school_class'
+    if any(x in low for x in ['корпор','корп']):
+        return 'corporate'
+    if any(x in low for x in ['мероприяти','yauza','crystal','сися','white studios']):
+        return 'event_sisia_white' if any(y in low for y in ['сися','white studios']) else 'event'
+    if 'floating' in low:
+        return 'floating'
+    if 'no_show' in low:
+        return 'no_show'
+    if 'tech' in low:
+        return 'tech'
+    return 'unknown'
+
+def legacy_classify_kassa_row(desc, аналитика):
+    if any(k in desc for k in DOP_KEYS):
+        return 'parking' if 'парковк' in desc or 'парк' in desc else 'dop'
+    if 'выручка' in desc:
+        if 'фото' in аналитика:
+            return 'fakt_photo'
+        if 'видео' in аналитика or 'мастер' in аналитика:
+            return 'fakt_video'
+    return None
+
+
+# --- Образцы ---
+KEYWORD_FRAGMENTS = (list(RAW_MAPPING) + DOP_KEYS + [
+    'видео', 'мастер', 'мастеркласс', 'школ', 'занятия', 'домашние', 'домаш', 'корпор', 'корп',
+    'мероприяти', 'yauza', 'crystal', 'сися', 'white studios', 'floating', 'no_show', 'tech',
+    'выручка', 'фото', 'количество часов: 3', 'Кол-во часов 2', 'Не приехали', '\n', ' ',
+])
+
+def popup_samples():
+    texts = []
+    for folder in ('Hohlovka', 'Yauza'):
+        path = os.path.join(STUDIO_ROOT, folder, 'debug_popups.txt')
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                texts += re.split(r'POPUP_TEXT:\n', f.read())[1:]
+    return texts
+
+def random_texts(base, count, seed=13):
+    rnd = random.Random(seed)
+    pieces = KEYWORD_FRAGMENTS + [t[i:i + 80] for t in base for i in range(0, len(t), 80)]
+    for _ in range(count):
+        text = ''.join(rnd.choice(pieces) + rnd.choice(['', ' ', '\n']) for _ in range(rnd.randint(0, 10)))
+        yield text.upper() if rnd.random() < 0.1 else text
+
+
+def test_booking_classification_matches_legacy():
+    base = popup_samples()
+    for text in base + list(random_texts(base, RANDOM_SAMPLES)):
+        assert classify_from_text(text) == legacy_classify_from_text(text), text
+
+def test_kassa_categorisation_matches_legacy():
+    rnd = random.Random(7)
+    analytics = ['', 'фото', 'видео', 'мастер-класс', 'прочее']
+    for desc in random_texts([], RANDOM_SAMPLES, seed=7):
+        desc = desc.lower()
+        a = rnd.choice(analytics)
+        assert classify_kassa_row(desc, a) == legacy_classify_kassa_row(desc, a), (desc, a)
+
+
+if __name__ == "__main__":
+    test_booking_classification_matches_legacy()
+    test_kassa_categorisation_matches_legacy()
+    print("Классификация совпадает с прежней реализацией.")
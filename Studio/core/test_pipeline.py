@@ -0,0 +1,134 @@
+"""
+Проверка: конвейер (--pipeline) с включённым кэшем броней даёт те же итоги по дням,
+что и обычный последовательный режим, — в том числе при повторном запуске, когда
+брони берутся из кэша в потоке загрузки.
+
+Запуск: python core/test_pipeline.py (или pytest). Браузер и Google Sheets заменены
+простыми объектами; нужны установленные зависимости проекта (selenium, gspread).
+"""
+import os
+import sys
+import tempfile
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+from datetime import datetime
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+for module in ('selenium', 'gspread', 'oauth2client', 'webdriver_manager', 'requests'):
+    pytest.importorskip(module)
+
+import core.engine as engine
+import core.pipeline as pipeline
+from core.booking_cache import BookingCache
+from core.studios import STUDIOS
+
+DAYS = [(day, month, 2026) for month, last in ((1, 31), (2, 28)) for day in range(1, last + 1)]
+MONTHS = ['января', 'февраля']
+CLASSES = ['Фотосъемка', 'Видео съемки/Мастер класс', 'Банкет']
+
+
+def fake_period():
+    """Тексты поп-апов и ячейки расписаний; ночная бронь каждого дня видна и на следующий день."""
+    texts, schedules = {}, {}
+    for day, month, year in DAYS:
+        cells = []
+        for k in range(3):
+            href = f"https://reservator/{month}-{day}-{k}"
+            hours = 'с 22:00 до 02:00' if k == 2 else 'с 10:00 до 13:00'
+            texts[href] = (f"Хохловка Яуза\nДата: {day} {MONTHS[month - 1]} {year}\n{hours}\n"
+                           f"{CLASSES[k]}\nПредоплата: {k * 100 + 100} руб.")
+            cells.append({'href': href, 'color': None, 'row': k, 'col': 1, 'rowspan': 1, 'slot': None})
+        schedules[datetime(year, month, day)] = cells
+    days = sorted(schedules)
+    for prev_day, day in zip(days, days[1:]):
+        schedules[day].append(dict(schedules[prev_day][2]))
+    schedules[datetime(2026, 1, 5)] = None  # день, который не загрузился
+    return texts, schedules
+
+
+class FakeFetcher:
+    def __init__(self, texts):
+        self.texts = texts
+        self.driver_lock = threading.RLock()
+
+    def prefetch(self, hrefs):
+        return {href: self.texts[href] for href in hrefs}
+
+    def get_text(self, href):
+        return self.texts[href]
+
+
+class FakeSheet:
+    def __init__(self, title):
+        self.title = title
+
+
+class FakeLedger:
+    def day_totals(self, date_str, studio_name):
+        return {'fakt_photo': 100, 'fakt_video': 200, 'dop': 300, 'parking_amount': 50, 'parking_count': 1}
+
+
+def comparable(results):
+    return [(profile['folder'], {day: {k: v for k, v in daily.items() if k != 'itogi_sheet'}
+                                 for day, daily in daily_data.items()})
+            for profile, daily_data in results]
+
+
+def fake_schedules(schedules, loaded=None):
+    """Замена iter_schedules: расписания из schedules; загруженные дни дописываются в loaded."""
+    def iter_schedules(driver, waiter, profile, days, **kwargs):
+        for day, month, year in days:
+            day_dt = datetime(year, month, day)
+            if loaded is not None:
+                loaded.append(day_dt)
+            yield day_dt, schedules[day_dt]
+    return iter_schedules
+
+
+@contextmanager
+def fake_engine(iter_schedules):
+    """Подменяет браузер и Google Sheets в core/engine.py; отдаёт готовый sheets_future."""
+    patched = {
+        'iter_schedules': iter_schedules,
+        'get_itogi_sheet': lambda workbook, day_dt: FakeSheet(day_dt.strftime('%m.%Y')),
+        'get_kassa_ledger': lambda *args, **kwargs: FakeLedger(),
+    }
+    saved = {name: getattr(engine, name) for name in patched}
+    for name, value in patched.items():
+        setattr(engine, name, value)
+    sheets_future = Future()
+    sheets_future.set_result({'fin_workbook': None,
+                              'kassa': {p['folder']: (None, {}) for p in STUDIOS.values()}})
+    try:
+        yield sheets_future
+    finally:
+        for name, value in saved.items():
+            setattr(engine, name, value)
+
+
+def test_pipeline_with_booking_cache_matches_sequential():
+    texts, schedules = fake_period()
+    profiles = [STUDIOS['Hohlovka'], STUDIOS['Yauza']]
+    with fake_engine(fake_schedules(schedules)) as sheets_future:
+        expected = [(profile, engine.process_studio(profile, DAYS, None, None, FakeFetcher(texts), None,
+                                                    sheets_future, fast_path=False)[0])
+                    for profile in profiles]
+        with tempfile.TemporaryDirectory() as tmp:
+            booking_cache = BookingCache(os.path.join(tmp, 'booking_cache.sqlite3'))
+            try:
+                # Второй прогон берёт все брони из кэша
+                for _ in range(2):
+                    results = pipeline.Pipeline(profiles, DAYS, None, None, FakeFetcher(texts), booking_cache,
+                                                sheets_future, fast_path=False, queue_size=2).run()
+                    assert comparable(results) == comparable(expected)
+                assert booking_cache.hits > 0
+            finally:
+                booking_cache.close()
+
+
+if __name__ == "__main__":
+    test_pipeline_with_booking_cache_matches_sequential()
+    print("Конвейер с кэшем броней совпадает с последовательным режимом.")
@@ -0,0 +1,105 @@
+"""
+Проверка модели быстрого пути (core/schedule.py): цвета и длина строки сетки
+подтверждаются большинством последних броней, разобранных по поп-апу, а запись
+брони по ячейкам (в том числе ночной, видной в расписаниях двух дней) совпадает
+с интервалом из поп-апа.
+
+Запуск: python core/test_schedule.py (или pytest).
+"""
+import os
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import core.schedule as schedule
+from core.bookings import split_hours
+from core.schedule import MIN_SAMPLES, ScheduleModel, schedule_record
+
+GREEN = '#00FF00'
+DAY = datetime(2026, 3, 1)
+NEXT_DAY = datetime(2026, 3, 2)
+
+
+def cell(slot, rowspan, color=GREEN):
+    return {'href': None, 'text': '', 'color': color, 'row': 0, 'col': 1, 'rowspan': rowspan, 'slot': slot}
+
+
+def record(cls, start, end):
+    return {'class': cls, 'start': start, 'end': end, 'declared_hours': None, 'next_line': None,
+            'prepayment': 0, 'booking_date': DAY.strftime('%d.%m.%Y')}
+
+
+def learned_model(count=MIN_SAMPLES):
+    """Модель, видевшая count банкетов зелёного цвета по 3 строки сетки (10:00–13:00)."""
+    model = ScheduleModel(None)
+    for k in range(count):
+        model.observe(f"banquet-{k}", [(DAY, cell('10:00', 3))], record('banquet', '10:00', '13:00'))
+    return model
+
+
+def test_rules_need_enough_agreeing_observations():
+    model = learned_model(MIN_SAMPLES - 1)
+    assert model.rules() == {'colors': {}, 'slot_minutes': None}
+    model.observe('banquet-last', [(DAY, cell('10:00', 3))], record('banquet', '10:00', '13:00'))
+    assert model.rules() == {'colors': {GREEN: 'banquet'}, 'slot_minutes': 60}
+
+
+def test_one_off_grid_booking_does_not_disable_fast_path():
+    model = learned_model(MIN_SAMPLES * 2)
+    # Начало 10:30 в сетке по часам: слот ячейки не совпал, наблюдение 0
+    model.observe('off-grid', [(DAY, cell('10:00', 2))], record('banquet', '10:30', '12:00'))
+    assert model.rules()['slot_minutes'] == 60
+    # А если такие брони стали заметной долей — строке сетки больше не верим
+    for k in range(MIN_SAMPLES):
+        model.observe(f"off-grid-{k}", [(DAY, cell('10:00', 2))], record('banquet', '10:30', '12:00'))
+    assert model.rules()['slot_minutes'] is None
+
+
+def test_recent_observations_replace_old_colour():
+    model = learned_model(MIN_SAMPLES * 2)
+    for k in range(schedule.RECENT_SAMPLES):
+        model.observe(f"school-{k}", [(DAY, cell('10:00', 3))], record('school_class', '10:00', '13:00'))
+    assert model.rules()['colors'] == {GREEN: 'school_class'}
+
+
+def test_observations_are_capped():
+    max_observations = schedule.MAX_OBSERVATIONS
+    schedule.MAX_OBSERVATIONS = 30
+    try:
+        model = learned_model(100)
+        for table in ('color_classes', 'slot_lengths'):
+            assert model.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] == 30
+        assert model.rules()['slot_minutes'] == 60
+    finally:
+        schedule.MAX_OBSERVATIONS = max_observations
+
+
+def test_schedule_record_matches_popup_for_overnight_booking():
+    rules = learned_model().rules()
+    # 22:00–02:00: две строки в конце первого дня и две в начале следующего
+    cells = [(DAY, cell('22:00', 2)), (NEXT_DAY, cell('00:00', 2))]
+    rec = schedule_record(cells, rules)
+    popup = record('banquet', '22:00', '02:00')
+    assert (rec['class'], rec['start'], rec['end'], rec['booking_date']) == \
+           (popup['class'], popup['start'], popup['end'], popup['booking_date'])
+    assert split_hours(rec, DAY) == split_hours(popup, DAY) == (2, 4.0)
+    assert split_hours(rec, NEXT_DAY) == split_hours(popup, NEXT_DAY) == (2, 4.0)
+
+
+def test_schedule_record_needs_popup():
+    rules = learned_model().rules()
+    assert schedule_record([(DAY, cell('10:00', 3, color='#0000FF'))], rules) is None  # незнакомый цвет
+    assert schedule_record([(DAY, cell('', 3))], rules) is None                        # слот не распознан
+    assert schedule_record([(DAY, cell('10:00', 3))], {'colors': {GREEN: 'banquet'}, 'slot_minutes': None}) is None
+    assert schedule_record([(DAY, cell('10:00', 3))], {'colors': {GREEN: 'photo'}, 'slot_minutes': 60}) is None
+
+
+if __name__ == "__main__":
+    test_rules_need_enough_agreeing_observations()
+    test_one_off_grid_booking_does_not_disable_fast_path()
+    test_recent_observations_replace_old_colour()
+    test_observations_are_capped()
+    test_schedule_record_matches_popup_for_overnight_booking()
+    test_schedule_record_needs_popup()
+    print("Модель быстрого пути работает.")
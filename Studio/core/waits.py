@@ -0,0 +1,147 @@
+"""
+Ожидания по состоянию страницы вместо фиксированных time.sleep.
+
+Каждое ожидание опрашивает условие и завершается, как только оно выполнено.
+Время каждого ожидания записывается, в конце прогона report() печатает сводку.
+"""
+import time
+from collections import defaultdict
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.common.by import By
+
+# Таймауты по умолчанию (секунды) для каждого вида ожидания
+WAIT_TIMEOUTS = {
+    'login': 15,      # смена URL после отправки формы логина
+    'schedule': 20,   # загрузка studioBody{ID} после showStudio(...)
+    'popup': 10,      # в тексте брони появилось "Дата:"
+    'page': 10,       # document.readyState после get/refresh
+}
+
+POLL_INTERVAL = 0.1
+
+
+class WaitTimeout(Exception):
+    pass
+
+
+# --- Условия ---
+# Условие: callable(driver) -> значение; ложное значение означает "ещё не готово".
+
+def text_stable(by, value, quiet=0.5):
+    """Текст элемента непустой и не менялся quiet секунд."""
+    state = {'text': None, 'since': None}
+
+    def condition(driver):
+        text = driver.find_element(by, value).text.strip()
+        now = time.monotonic()
+        if not text or text != state['text']:
+            state['text'], state['since'] = text, now
+            return False
+        return text if now - state['since'] >= quiet else False
+    return condition
+
+
+def studio_body_stable(studio_id, quiet=0.5):
+    return text_stable(By.ID, f"studioBody{studio_id}", quiet)
+
+
+def body_contains(marker):
+    def condition(driver):
+        text = driver.find_element(By.TAG_NAME, "body").text
+        return text if marker in text else False
+    return condition
+
+
+def url_changed(old_url):
+    def condition(driver):
+        return driver.current_url != old_url
+    return condition
+
+
+def document_ready():
+    def condition(driver):
+        return driver.execute_script("return document.readyState") in ('interactive', 'complete')
+    return condition
+
+
+def show_studio_day(waiter, studio_id, date_str):
+    """
+    Вызывает showStudio(...) и ждёт, пока расписание дня загрузится и перестанет меняться.
+    Перед вызовом studioBody очищается, чтобы не принять старое содержимое за новый день.
+    """
+    waiter.driver.execute_script(
+        f"var el = document.getElementById('studioBody{studio_id}'); if (el) el.innerHTML = '';"
+        f"showStudio({studio_id}, '{date_str}');"
+    )
+    return waiter.until('schedule', studio_body_stable(studio_id))
+
+
+def open_page(waiter, url):
+    waiter.driver.get(url)
+    waiter.until('page', document_ready(), required=False)
+
+
+def refresh_page(waiter):
+    waiter.driver.refresh()
+    waiter.until('page', document_ready(), required=False)
+
+
+class Waiter:
+    """Опрашивает условия с таймаутом и копит статистику по каждому виду ожидания."""
+
+    def __init__(self, driver, timeouts=None, poll=POLL_INTERVAL, verbose=False):
+        self.driver = driver
+        self.timeouts = dict(WAIT_TIMEOUTS, **(timeouts or {}))
+        self.poll = poll
+        self.verbose = verbose
+        self.durations = defaultdict(list)
+        self.timeouts_hit = defaultdict(int)
+
+    def until(self, name, condition, timeout=None, required=True):
+        """
+        Ждёт, пока condition(driver) вернёт истинное значение, и возвращает его.
+        При таймауте бросает WaitTimeout, либо (required=False) возвращает None.
+        """
+        timeout = self.timeouts[name] if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+        last_error = None
+        while True:
+            try:
+                value = condition(self.driver)
+                if value:
+                    self._record(name, time.monotonic() - started)
+                    return value
+            except WebDriverException as e:
+                # Элемент ещё не появился или был перерисован
+                last_error = e
+            if time.monotonic() >= deadline:
+                break
+            time.sleep(self.poll)
+
+        self._record(name, time.monotonic() - started, timed_out=True)
+        message = f"Ожидание '{name}' не дождалось условия за {timeout} с"
+        if last_error is not None:
+            message += f" ({type(last_error).__name__})"
+        if required:
+            raise WaitTimeout(message)
+        print(message + ". Продолжаем.")
+        return None
+
+    def _record(self, name, elapsed, timed_out=False):
+        self.durations[name].append(elapsed)
+        if timed_out:
+            self.timeouts_hit[name] += 1
+        if self.verbose:
+            print(f"[wait] {name}: {elapsed:.2f} с{' (таймаут)' if timed_out else ''}")
+
+    def report(self):
+        if not self.durations:
+            return
+        print("Статистика ожиданий:")
+        for name, values in self.durations.items():
+            total = sum(values)
+            print(f"  {name}: {len(values)} шт., всего {total:.1f} с, "
+                  f"среднее {total / len(values):.2f} с, макс {max(values):.2f} с, "
+                  f"таймаутов {self.timeouts_hit[name]}")
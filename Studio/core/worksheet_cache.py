@@ -0,0 +1,41 @@
+"""
+Кэш листов Google Sheets по названию, общий на весь процесс.
+
+Список листов таблицы запрашивается один раз (одним запросом метаданных
+worksheets()), дальше лист по названию берётся из кэша без запросов.
+Лист, созданный через create(), сразу попадает в кэш.
+"""
+import threading
+
+
+class WorksheetCache:
+    def __init__(self):
+        self.by_workbook = {}  # id таблицы -> {название листа: Worksheet}
+        self.lock = threading.Lock()
+        self.fetches = 0
+
+    def sheets(self, workbook):
+        """{название: Worksheet} таблицы; метаданные запрашиваются при первом обращении."""
+        with self.lock:
+            if workbook.id not in self.by_workbook:
+                self.by_workbook[workbook.id] = {ws.title: ws for ws in workbook.worksheets()}
+                self.fetches += 1
+            return self.by_workbook[workbook.id]
+
+    def get(self, workbook, title):
+        """Лист по названию или None, если его нет."""
+        return self.sheets(workbook).get(title)
+
+    def create(self, workbook, title, rows, cols):
+        sheet = workbook.add_worksheet(title=title, rows=rows, cols=cols)
+        with self.lock:
+            self.by_workbook.setdefault(workbook.id, {})[title] = sheet
+        return sheet
+
+    def invalidate(self, workbook):
+        with self.lock:
+            self.by_workbook.pop(workbook.id, None)
+
+
+# Один кэш на процесс: его используют все студии и фоновая загрузка таблиц
+WORKSHEETS = WorksheetCache()
@@ -6,9 +6,26 @@ import re
 from datetime import datetime
 import queue
 
+from core.analytics import ANALYTICS_FILE, AnalyticsStore
+from core.parsing import CATEGORY_LABELS
+from core.studios import STUDIOS
+
 ctk.set_appearance_mode("dark")
 ctk.set_default_color_theme("blue")
 
+# Профили браузера для скриптов студий (флаг --browser, см. core/browser.py)
+BROWSER_MODES = {"Фоновый": "scraper", "Видимый": "visible"}
+
+# Название студии в выводе скрипта -> ключ STUDIOS (по нему итоги читаются из аналитической базы)
+STUDIO_KEYS = {profile['name']: key for key, profile in STUDIOS.items()}
+
+# Студия -> (папка запуска, скрипт). "Обе" — одна сессия на обе студии (core/engine.py)
+STUDIO_SCRIPTS = {
+    "Hohlovka": ("Hohlovka", "main.py"),
+    "Yauza": ("Yauza", "yauza_main.py"),
+    "Обе": (".", "all_studios_main.py"),
+}
+
 class StudioAnalyzer(ctk.CTk):
     def __init__(self):
         super().__init__()
@@ -19,7 +36,11 @@ class StudioAnalyzer(ctk.CTk):
         studio_frame = ctk.CTkFrame(self)
         studio_frame.pack(pady=10, padx=10, fill="x")
         ctk.CTkLabel(studio_frame, text="Выберите студию:").pack(side="left", padx=10)
-        ctk.CTkOptionMenu(studio_frame, values=["Hohlovka", "Yauza"], variable=self.studio_var).pack(side="left", padx=10)
+        ctk.CTkOptionMenu(studio_frame, values=list(STUDIO_SCRIPTS), variable=self.studio_var).pack(side="left", padx=10)
+        
+        self.browser_var = ctk.StringVar(value="Видимый")
+        ctk.CTkLabel(studio_frame, text="Браузер:").pack(side="left", padx=10)
+        ctk.CTkOptionMenu(studio_frame, values=list(BROWSER_MODES), variable=self.browser_var).pack(side="left", padx=10)
         
         input_frame = ctk.CTkFrame(self)
         input_frame.pack(pady=10, padx=10, fill="x")
@@ -82,7 +103,8 @@ class StudioAnalyzer(ctk.CTk):
             return
         
         studio = self.studio_var.get()
-        folder = studio
+        folder, main_file = STUDIO_SCRIPTS[studio]
+        browser = BROWSER_MODES[self.browser_var.get()]
         
         self.log_text.delete("1.0", "end")
         for widget in self.tree.winfo_children():
@@ -96,8 +118,7 @@ class StudioAnalyzer(ctk.CTk):
         def run_script():
             try:
                 os.chdir(os.path.join(os.path.dirname(__file__), folder))
-                main_file = "main.py" if studio == "Hohlovka" else "yauza_main.py"
-                cmd = ["python", main_file]
+                cmd = ["python", main_file, "--browser", browser]
                 self.process = subprocess.Popen(
                     cmd,
                     stdin=subprocess.PIPE,
@@ -165,9 +186,58 @@ class StudioAnalyzer(ctk.CTk):
     
     def parse_table(self):
         log_content = self.log_text.get("1.0", "end")
-        days = re.findall(r'Day (\d{2}\.\d{2}\.\d{4}):(.*?)(?=Day |Общие часы|$)', log_content, re.DOTALL | re.UNICODE)
+        # Вывод делится на секции по студиям (при запуске "Обе" их несколько)
+        parts = re.split(r'--- АВТОМАТИЗАЦИЯ ДЛЯ СТУДИИ: (.+?) ---', log_content)
+        sections = list(zip(parts[1::2], parts[2::2])) or [(None, log_content)]
         
+        # Итоги — SQL-запросами к аналитической базе (core/analytics.py); без неё — разбором вывода
+        store = AnalyticsStore() if os.path.exists(ANALYTICS_FILE) else None
         row = 0
+        for studio, section in sections:
+            if studio and len(sections) > 1:
+                ctk.CTkLabel(self.tree, text=f"Студия: {studio}", font=ctk.CTkFont(size=16, weight="bold")).grid(row=row, column=0, columnspan=3, pady=10, sticky="w")
+                row += 1
+            days = [datetime.strptime(day, '%d.%m.%Y') for day in re.findall(r'Day (\d{2}\.\d{2}\.\d{4}):', section)]
+            if store and studio in STUDIO_KEYS and days:
+                row = self.store_section(store, STUDIO_KEYS[studio], days, row)
+            else:
+                row = self.parse_section(section, row)
+        if store:
+            store.close()
+
+    def store_section(self, store, studio_key, days, row):
+        for day in days:
+            totals = store.day_totals(studio_key, day)
+            ctk.CTkLabel(self.tree, text=f"День: {day.strftime('%d.%m.%Y')}", font=ctk.CTkFont(size=14, weight="bold")).grid(row=row, column=0, columnspan=3, pady=5, sticky="w")
+            row += 1
+
+            for cat, key in CATEGORY_LABELS:
+                ctk.CTkLabel(self.tree, text=cat).grid(row=row, column=0, sticky="w")
+                ctk.CTkLabel(self.tree, text=f"{round(totals['daily_hours_totals'].get(key, 0.0), 2)} ч").grid(row=row, column=1, sticky="w")
+                ctk.CTkLabel(self.tree, text=f"Броней: {totals['daily_counts'].get(key, 0)}").grid(row=row, column=2, sticky="w")
+                row += 1
+
+            school_hours = totals['daily_hours_totals'].get('school_class', 0.0) + totals['daily_hours_totals'].get('school_homework', 0.0)
+            money = [("Предоплаты фото", totals['prep_photo']), ("Предоплаты видео", totals['prep_video']),
+                     ("По факту фото", totals['fakt_photo']), ("По факту видео", totals['fakt_video']),
+                     ("Доп. услуги", totals['dop']), ("Парковки сумма", totals['parking_amount']),
+                     ("Школа по часам", int(school_hours * 600))]
+            for label, amount in money:
+                ctk.CTkLabel(self.tree, text=label).grid(row=row, column=0, sticky="w")
+                ctk.CTkLabel(self.tree, text=f"{amount} руб.").grid(row=row, column=1, columnspan=2, sticky="w")
+                row += 1
+
+        ctk.CTkLabel(self.tree, text="Общие итоги:", font=ctk.CTkFont(size=14, weight="bold")).grid(row=row, column=0, columnspan=3, pady=10, sticky="w")
+        row += 1
+        period_hours = store.period_hours(studio_key, days)
+        for cat, key in CATEGORY_LABELS:
+            ctk.CTkLabel(self.tree, text=f"{cat}: {round(period_hours.get(key, 0.0), 2)} ч").grid(row=row, column=0, columnspan=3, sticky="w")
+            row += 1
+        return row
+    
+    def parse_section(self, log_content, row):
+        days = re.findall(r'Day (\d{2}\.\d{2}\.\d{4}):(.*?)(?=Day |Общие часы|$)', log_content, re.DOTALL | re.UNICODE)
+        
         for day, content in days:
             ctk.CTkLabel(self.tree, text=f"День: {day}", font=ctk.CTkFont(size=14, weight="bold")).grid(row=row, column=0, columnspan=3, pady=5, sticky="w")
             row += 1
@@ -193,6 +263,7 @@ class StudioAnalyzer(ctk.CTk):
             for cat, h in totals:
                 ctk.CTkLabel(self.tree, text=f"{cat}: {h} ч").grid(row=row, column=0, columnspan=3, sticky="w")
                 row += 1
+        return row
 
 if __name__ == "__main__":
     app = StudioAnalyzer()